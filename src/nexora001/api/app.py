@@ -5,6 +5,7 @@ Main FastAPI application for Nexora001 API.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import sys
 from pathlib import Path
 
@@ -125,12 +126,51 @@ async def startup_event():
     # Warm up the RAG pipeline
     from nexora001.api.dependencies import get_rag_pipeline
     get_rag_pipeline()
+    # Activity log retention and counter reconciliation run as a daily
+    # batch. Keep a reference: the event loop only holds tasks weakly.
+    app.state.maintenance_task = asyncio.create_task(run_daily_maintenance())
     print("✅ API ready!")
 
 
+# Daily maintenance schedule; the first run is delayed so worker restarts
+# don't each trigger a purge
+MAINTENANCE_INTERVAL = 24 * 60 * 60
+MAINTENANCE_FIRST_DELAY = 60 * 60
+
+
+async def run_daily_maintenance():
+    """
+    Once a day, starting an hour after startup: purge expired activity logs
+    and correct drift in the users' unacknowledged doc/api key counters.
+    """
+    from nexora001.api.dependencies import get_storage
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(MAINTENANCE_FIRST_DELAY)
+    while True:
+        storage = get_storage()
+        try:
+            deleted = await loop.run_in_executor(None, storage.purge_old_activity_logs)
+            print(f"🧹 Purged {deleted} expired activity logs")
+        except Exception as e:
+            print(f"Warning: Activity log purge failed: {e}")
+        try:
+            counts = await loop.run_in_executor(None, storage.reconcile_user_counts)
+            print(f"🧮 Reconciled usage counters for {len(counts)} users")
+        except Exception as e:
+            print(f"Warning: Usage counter reconciliation failed: {e}")
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     print("👋 Nexora001 API shutting down...")
+    maintenance_task = getattr(app.state, "maintenance_task", None)
+    if maintenance_task is not None:
+        maintenance_task.cancel()
+        try:
+            await maintenance_task
+        except asyncio.CancelledError:
+            pass
     from nexora001.api.dependencies import reset_dependencies
     reset_dependencies()
\ No newline at end of file
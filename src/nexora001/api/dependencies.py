@@ -51,6 +51,8 @@ def get_storage() -> MongoDBStorage:
 def reset_dependencies():
     """Reset all singletons (useful for testing)."""
     global _rag_pipeline, _storage
+    if _storage is not None:
+        _storage.close()  # Don't drop buffered chat history / key usage
     _rag_pipeline = None
     _storage = None
 
@@ -80,14 +80,14 @@ def get_database_metrics(storage) -> Dict[str, Any]:
         # MongoDB Stats
         db_stats = storage.db.command("dbStats")
         
-        # Collection counts
+        # Collection counts (from collection metadata, no scans)
         collections = {
-            "users": storage.users.count_documents({}),
-            "documents": storage.documents.count_documents({}),
-            "chat_sessions": storage.chat_sessions.count_documents({}),
-            "crawl_jobs": storage.crawl_jobs.count_documents({}),
-            "api_keys": storage.api_keys.count_documents({}),
-            "activity_logs": storage.activity_logs.count_documents({})
+            "users": storage.users.estimated_document_count(),
+            "documents": storage.documents.estimated_document_count(),
+            "chat_sessions": storage.chat_sessions.estimated_document_count(),
+            "crawl_jobs": storage.crawl_jobs.estimated_document_count(),
+            "api_keys": storage.api_keys.estimated_document_count(),
+            "activity_logs": storage.activity_logs.estimated_document_count()
         }
         
         # Database size
@@ -350,6 +350,7 @@ class UserSubmissionRecord(BaseModel):
 class SubmissionListResponse(BaseModel):
     """Response for listing submissions."""
     submissions: List[UserSubmissionRecord]
-    total: int
+    total: Optional[int] = None
     page: int
-    page_size: int
\ No newline at end of file
+    page_size: int
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -187,23 +187,21 @@ async def get_user_details(
     admin: dict = Depends(get_current_active_superuser)
 ):
     """Super Admin: Get comprehensive user information including widget settings."""
-    from bson import ObjectId
-    
     user = storage.users.find_one({"_id": ObjectId(user_id)})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get documents
-    documents = list(storage.documents.find(
+    # Get documents (streamed; converted as each batch arrives)
+    documents = []
+    for doc in storage.documents.find(
         {"client_id": user_id},
         {"filename": 1, "file_size": 1, "uploaded_at": 1, "status": 1, "metadata": 1}
-    ))
-    
-    # Convert ObjectId to string for JSON serialization
-    for doc in documents:
+    ).batch_size(500):
+        # Convert ObjectId to string for JSON serialization
         doc["_id"] = str(doc["_id"])
         if "uploaded_at" in doc:
             doc["uploaded_at"] = doc["uploaded_at"].isoformat() if hasattr(doc["uploaded_at"], "isoformat") else str(doc["uploaded_at"])
+        documents.append(doc)
     
     # Get API keys
     api_keys = list(storage.api_keys.find(
@@ -272,8 +270,6 @@ async def delete_user_document(
     admin: dict = Depends(get_current_active_superuser)
 ):
     """Super Admin: Delete specific user document and its vectors."""
-    from bson import ObjectId
-    
     # Get document info before deletion
     doc = storage.documents.find_one({"_id": ObjectId(doc_id), "client_id": user_id})
     
@@ -302,8 +298,6 @@ async def revoke_user_api_key(
     admin: dict = Depends(get_current_active_superuser)
 ):
     """Super Admin: Revoke user's API key (makes it unusable but keeps in DB)."""
-    from bson import ObjectId
-    
     # Get key info before revocation
     key = storage.api_keys.find_one({"_id": ObjectId(key_id), "client_id": user_id})
     if not key:
@@ -341,23 +335,29 @@ async def get_activity_logs(
     end_date: Optional[str] = None,
     limit: int = 100,
     skip: int = 0,
+    cursor: Optional[str] = None,
     storage: MongoDBStorage = Depends(get_storage),
     admin: dict = Depends(get_current_active_superuser)
 ):
-    """Super Admin: Get activity logs with filtering."""
+    """Super Admin: Get activity logs with filtering (pass next_cursor to page by key)."""
     # Parse dates if provided
     start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00')) if start_date else None
     end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00')) if end_date else None
     
-    logs, total = storage.get_activity_logs(
-        user_id=user_id,
-        action_type=action_type,
-        resource_type=resource_type,
-        start_date=start_dt,
-        end_date=end_dt,
-        limit=limit,
-        skip=skip
-    )
+    try:
+        logs, total, next_cursor = storage.get_activity_logs(
+            user_id=user_id,
+            action_type=action_type,
+            resource_type=resource_type,
+            start_date=start_dt,
+            end_date=end_dt,
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            include_total=cursor is None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Enrich logs with user info
     for log in logs:
@@ -373,7 +373,8 @@ async def get_activity_logs(
         "logs": logs,
         "total": total,
         "page": skip // limit + 1,
-        "pages": (total + limit - 1) // limit
+        "pages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor
     }
 
 @router.get("/user/{user_id}/activity")
@@ -511,8 +512,6 @@ async def export_users_csv(
     import io
     import csv
     
-    users = list(storage.users.find())
-    
     # Create CSV in memory
     output = io.StringIO()
     writer = csv.DictWriter(output, fieldnames=[
@@ -520,7 +519,9 @@ async def export_users_csv(
     ])
     writer.writeheader()
     
-    for user in users:
+    total_users = 0
+    for user in storage.users.find({}, {"password_hash": 0}).batch_size(500):
+        total_users += 1
         writer.writerow({
             "id": str(user["_id"]),
             "email": user.get("email", ""),
@@ -537,7 +538,7 @@ async def export_users_csv(
         user_id=str(admin["_id"]),
         action_type="export_users",
         resource_type="users",
-        details={"format": "csv", "total_users": len(users), "admin_email": admin["email"]}
+        details={"format": "csv", "total_users": total_users, "admin_email": admin["email"]}
     )
     
     output.seek(0)
@@ -584,32 +585,27 @@ async def gdpr_data_export(
     }
     
     # Documents
-    documents = list(storage.documents.find({"client_id": user_id}))
-    for doc in documents:
+    for doc in storage.documents.find({"client_id": user_id}).batch_size(500):
         doc["_id"] = str(doc["_id"])
         data["documents"].append(doc)
     
     # Chat sessions
-    sessions = list(storage.chat_sessions.find({"client_id": user_id}))
-    for session in sessions:
+    for session in storage.chat_sessions.find({"client_id": user_id}).batch_size(500):
         session["_id"] = str(session["_id"])
         data["chat_sessions"].append(session)
     
     # API keys
-    keys = list(storage.api_keys.find({"client_id": user_id}))
-    for key in keys:
+    for key in storage.api_keys.find({"client_id": user_id}).batch_size(500):
         key["_id"] = str(key["_id"])
         data["api_keys"].append(key)
     
     # Crawl jobs
-    crawls = list(storage.crawl_jobs.find({"client_id": user_id}))
-    for crawl in crawls:
+    for crawl in storage.crawl_jobs.find({"client_id": user_id}).batch_size(500):
         crawl["_id"] = str(crawl["_id"])
         data["crawl_jobs"].append(crawl)
     
     # Activity logs
-    logs = list(storage.activity_logs.find({"user_id": user_id}))
-    for log in logs:
+    for log in storage.activity_logs.find({"user_id": user_id}).batch_size(500):
         log["_id"] = str(log["_id"])
         if "timestamp" in log:
             log["timestamp"] = str(log["timestamp"])
@@ -670,6 +666,7 @@ async def get_analytics_overview(
     # Activity by type
     activity_types = list(storage.activity_logs.aggregate([
         {"$match": {"timestamp": {"$gte": start_date}}},
+        {"$project": {"_id": 0, "action_type": 1}},  # Covered by the timestamp index
         {"$group": {"_id": "$action_type", "count": {"$sum": 1}}},
         {"$sort": {"count": -1}}
     ]))
@@ -685,7 +682,7 @@ async def get_analytics_overview(
     
     # Active users (logged in within period)
     active_users = storage.users.count_documents({"last_login": {"$gte": start_date}})
-    total_users = storage.users.count_documents({})
+    total_users = storage.users.estimated_document_count()
     
     return {
         "period_days": days,
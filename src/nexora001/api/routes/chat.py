@@ -334,13 +334,12 @@ async def update_chatbot_settings(
         
         # Update in database
         client_id = str(current_user["_id"])
-        success = storage.update_chatbot_settings(client_id, updates)
+        settings = storage.update_chatbot_settings(client_id, updates)
         
-        if not success:
+        if not settings:
             raise HTTPException(status_code=500, detail="Failed to update settings")
         
         # Return updated settings
-        settings = storage.get_chatbot_settings(client_id)
         return ChatbotSettings(**settings)
         
     except HTTPException:
@@ -121,10 +121,16 @@ async def submit_user_data(
 async def get_user_submissions(
     page: int = 1,
     page_size: int = 50,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     storage: MongoDBStorage = Depends(get_storage)
 ):
-    """Get all user data submissions for the current client."""
+    """
+    Get all user data submissions for the current client.
+    
+    Pass the returned next_cursor to fetch the following page without
+    skipping; the total is only counted for page-number requests.
+    """
     client_id = str(current_user["_id"])
     
     if page < 1:
@@ -132,7 +138,12 @@ async def get_user_submissions(
     if page_size < 1 or page_size > 100:
         page_size = 50
     
-    submissions, total = storage.get_user_submissions(client_id, page, page_size)
+    try:
+        submissions, total, next_cursor = storage.get_user_submissions(
+            client_id, page, page_size, cursor=cursor, include_total=cursor is None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Convert to response models
     submission_records = [
@@ -150,7 +161,8 @@ async def get_user_submissions(
         submissions=submission_records,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
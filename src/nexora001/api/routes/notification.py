@@ -36,4 +36,12 @@ async def mark_read(
     current_user: dict = Depends(get_current_user)
 ):
     storage.mark_notification_read(note_id, current_user["_id"])
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.put("/read-all")
+async def mark_all_read(
+    storage: MongoDBStorage = Depends(get_storage),
+    current_user: dict = Depends(get_current_user)
+):
+    updated = storage.mark_all_notifications_read(current_user["_id"])
+    return {"status": "ok", "updated": updated}
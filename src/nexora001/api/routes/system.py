@@ -235,13 +235,9 @@ async def delete_documents_by_source(
     try:
         client_id = current_user["_id"]
         # Modified to only delete documents belonging to the current user
-        filter_query = {
-            "metadata.source_url": source_url,
-            "client_id": client_id
-        }
-        result = storage.documents.delete_many(filter_query)
+        deleted_count = storage.delete_by_url(client_id, source_url)
         
-        if result.deleted_count == 0:
+        if deleted_count == 0:
             return DeleteResponse(
                 success=False,
                 deleted_count=0,
@@ -250,8 +246,8 @@ async def delete_documents_by_source(
         
         return DeleteResponse(
             success=True,
-            deleted_count=result.deleted_count,
-            message=f"Successfully deleted {result.deleted_count} documents from {source_url}"
+            deleted_count=deleted_count,
+            message=f"Successfully deleted {deleted_count} documents from {source_url}"
         )
         
     except Exception as e:
@@ -288,12 +284,12 @@ async def delete_all_documents(
     try:
         client_id = current_user["_id"]
         # Modified to only delete documents belonging to the current user
-        result = storage.documents.delete_many({"client_id": client_id})
+        deleted_count = storage.delete_client_documents(client_id)
         
         return DeleteResponse(
             success=True,
-            deleted_count=result.deleted_count,
-            message=f"Deleted all {result.deleted_count} documents for user"
+            deleted_count=deleted_count,
+            message=f"Deleted all {deleted_count} documents for user"
         )
         
     except Exception as e:
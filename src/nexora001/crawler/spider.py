@@ -14,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from nexora001.storage.mongodb import MongoDBStorage
 from nexora001.processors.chunker import TextChunker
-from nexora001.processors.embeddings import EmbeddingGenerator, EmbeddingProvider
+from nexora001.processors.embeddings import get_embedding_generator
 
 
 class Nexora001Spider(scrapy.Spider):
@@ -88,9 +88,7 @@ class Nexora001Spider(scrapy.Spider):
         if self.enable_embeddings:
             try:
                 self.logger.info("Initializing embedding generator...")
-                self.embedding_generator = EmbeddingGenerator(
-                    provider=EmbeddingProvider.SENTENCE_TRANSFORMERS
-                )
+                self.embedding_generator = get_embedding_generator("sentence_transformers")
                 self.logger.info(f"✓ Embeddings enabled (dimension: {self.embedding_generator.get_dimension()})")
             except Exception as e:
                 self.logger.warning(f"Failed to initialize embeddings: {e}")
@@ -207,61 +205,74 @@ class Nexora001Spider(scrapy.Spider):
         
         self.logger.info(f"  Created {len(chunks)} chunks")
         
-        # Process and store chunks
+        # Generate embeddings for all chunks in one batch if enabled
+        embeddings = [None] * len(chunks)
+        if self.enable_embeddings and self.embedding_generator and chunks:
+            try:
+                embeddings = self.embedding_generator.generate_embeddings(
+                    [chunk['text'] for chunk in chunks]
+                )
+            except Exception as e:
+                self.logger.warning(f"  Failed to generate embeddings: {e}")
+        
+        # Process chunks, then store them in one insert per kind
         stored_count = 0
-        for chunk in chunks:
+        embedded_items = []
+        plain_items = []
+        for chunk, embedding in zip(chunks, embeddings):
             try:
                 chunk_text = chunk['text']
                 chunk_index = chunk['chunk_index']
                 total_chunks = chunk['total_chunks']
                 
-                # Generate embedding if enabled
-                embedding = None
-                if self.enable_embeddings and self.embedding_generator:
-                    try:
-                        embedding = self.embedding_generator.generate_embedding(chunk_text)
-                    except Exception as e:
-                        self.logger.warning(f"  Failed to generate embedding for chunk {chunk_index}: {e}")
-                
                 # Store in MongoDB
                 if embedding:
-                    doc_id = self.storage.store_document_with_embedding(
-                        client_id=self.client_id,
-                        content=chunk_text,
-                        embedding=embedding,
-                        source_url=response.url,
-                        source_type="web",
-                        title=title,
-                        chunk_index=chunk_index,
-                        total_chunks=total_chunks,
-                        metadata={
+                    embedded_items.append({
+                        "content": chunk_text,
+                        "embedding": embedding,
+                        "source_url": response.url,
+                        "chunk_index": chunk_index,
+                        "total_chunks": total_chunks,
+                        "metadata": {
                             "depth": depth,
                             "chunk_char_count": chunk['char_count'],
                             "rendered_with_playwright": self.use_playwright
                         }
-                    )
+                    })
                 else:
-                    doc_id = self.storage.store_document(
-                        client_id=self.client_id,
-                        content=chunk_text,
-                        source_url=response.url,
-                        source_type="web",
-                        title=title,
-                        metadata={
+                    plain_items.append({
+                        "content": chunk_text,
+                        "source_url": response.url,
+                        "metadata": {
                             "depth": depth,
                             "chunk_index": chunk_index,
                             "total_chunks": total_chunks,
                             "chunk_char_count": chunk['char_count'],
                             "rendered_with_playwright": self.use_playwright
                         }
-                    )
-                
-                stored_count += 1
-                self.chunks_created += 1
+                    })
                 
             except Exception as e:
-                self.logger.error(f"  \u2717 Failed to store chunk {chunk_index}: {e}")
+                self.logger.error(f"  \u2717 Failed to process chunk {chunk_index}: {e}")
+                continue
+        
+        for store, items in (
+            (self.storage.store_documents_with_embeddings_bulk, embedded_items),
+            (self.storage.store_documents_bulk, plain_items),
+        ):
+            if not items:
                 continue
+            try:
+                doc_ids = store(
+                    client_id=self.client_id,
+                    items=items,
+                    source_type="web",
+                    title=title
+                )
+                stored_count += len(doc_ids)
+                self.chunks_created += len(doc_ids)
+            except Exception as e:
+                self.logger.error(f"  \u2717 Failed to store {len(items)} chunks: {e}")
         
         self.pages_crawled += 1
         self.documents_created += stored_count
@@ -139,9 +139,15 @@ def handle_list():
         with get_storage() as storage:
             # Fetch ONLY this client's documents
             # Note: We use .find() directly here for simplicity
+            # Size comes from the stored length (computed server-side for
+            # older chunks), so the chunk text itself is never sent back
             cursor = storage.documents.find(
                 {"client_id": CURRENT_USER['_id']},
-                {"metadata": 1, "content": 1}
+                {
+                    "metadata.title": 1,
+                    "metadata.source_url": 1,
+                    "content_length": {"$ifNull": ["$metadata.content_length", {"$strLenCP": "$content"}]}
+                }
             ).limit(20)
             
             documents = list(cursor)
@@ -158,7 +164,7 @@ def handle_list():
             
             for i, doc in enumerate(documents, 1):
                 meta = doc.get('metadata', {})
-                content_len = len(doc.get('content', ''))
+                content_len = doc.get('content_length', 0)
                 
                 table.add_row(
                     str(doc["_id"]),
@@ -311,9 +317,9 @@ def handle_ask(args: str):
         console.print(Panel(Markdown(result['answer']), title="🤖 Nexora AI"))
         
         if result.get('sources'):
-            console.print("\n[dim]📚 Sources (Authenticated Access Only):[/dim]")
-            for src in result['sources']:
-                console.print(f" - {src['url']} ({src['score']:.0%})")
+            lines = ["\n[dim]📚 Sources (Authenticated Access Only):[/dim]"]
+            lines.extend(f" - {src['url']} ({src['score']:.0%})" for src in result['sources'])
+            console.print("\n".join(lines))
                 
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -444,6 +450,22 @@ def handle_admin_delete_client(args: str):
             else:
                 console.print("[yellow]User not found.[/yellow]")
 
+def handle_admin_migrate_vectors():
+    """Normalize legacy embeddings, then create the Atlas vector index."""
+    if not require_admin(): return
+    
+    with get_storage() as s:
+        with console.status("Normalizing legacy embeddings..."):
+            count = s.normalize_legacy_embeddings()
+        console.print(f"[green]✅ Normalized {count} legacy embeddings.[/green]")
+        
+        # The index scores with dotProduct, which is only correct once every
+        # stored vector is unit length, so it is created after the migration
+        if s.ensure_vector_search_index():
+            console.print("[green]✅ Created Atlas vector_index (dotProduct, scalar quantization).[/green]")
+        else:
+            console.print("[yellow]vector_index already exists or Atlas Search is unavailable.[/yellow]")
+
 # ==========================================
 #  END USER WIDGET SIMULATION
 # ==========================================
@@ -464,8 +486,9 @@ def handle_simulate_widget():
         console.print(f"[green]✅ Connected to Knowledge Base ID: {client_id}[/green]")
         console.print("[dim]Type 'exit' to close the chat widget.[/dim]\n")
         
-        # Initialize RAG
-        from nexora001.rag.pipeline import create_rag_pipeline
+        # Dedicated pipeline: conversation history is per instance and must not
+        # mix with the admin's 'ask' history. The embedding model is still
+        # shared through get_embedding_generator()'s cache.
         rag = create_rag_pipeline(model_name="gemini-2.5-flash")
         
         # Generate a temporary session ID for this visitor
@@ -540,6 +563,7 @@ def print_help():
 | `delete <doc_id>` | Delete a document by ID |
 | `list_clients` | List all clients |
 | `delete_client <client_id>` | Delete a client and all their data |
+| `migrate_vectors` | Normalize legacy embeddings and create the vector index |
 
 ## General
 | Command | Description |
@@ -581,6 +605,7 @@ def handle_command(command: str) -> bool:
     elif cmd == "delete": handle_delete_docs(args)
     elif cmd == "unban": handle_admin_unban(args)
     elif cmd == "delete_client": handle_admin_delete_client(args)
+    elif cmd == "migrate_vectors": handle_admin_migrate_vectors()
     
     # Add handlers for list/delete similarly...
     
@@ -129,57 +129,68 @@ class DOCXProcessor:
         with get_storage() as storage:
             chunks_stored = 0
             
-            for chunk in chunks:
+            if self.generate_embeddings:
+                # Embed every chunk in one batch, then store them all in one round-trip
+                items = []
                 try:
-                    chunk_text = chunk['text']
-                    chunk_index = chunk['chunk_index']
-                    total_chunks = chunk['total_chunks']
-                    
-                    # Generate embedding if enabled
-                    embedding = None
-                    if self.generate_embeddings:
-                        embedding = self.embedding_generator.generate_embedding(chunk_text)
-                    
-                    # Store in MongoDB
-                    if embedding:
-                        storage.store_document_with_embedding(
-                            client_id=client_id,
-                            content=chunk_text,
-                            embedding=embedding,
-                            source_url=source_url,
-                            source_type="docx",
-                            title=metadata["title"],
-                            chunk_index=chunk_index,
-                            total_chunks=total_chunks,
-                            metadata={
-                                "filename": metadata["filename"],
-                                "author": metadata["author"],
-                                "paragraphs": metadata["paragraphs"],
-                                "tables": metadata["tables"],
-                                "chunk_char_count": chunk['char_count']
-                            }
-                        )
-                    else:
-                        storage.store_document(
-                            client_id=client_id,
-                            content=chunk_text,
-                            source_url=source_url,
-                            source_type="docx",
-                            title=metadata["title"],
-                            metadata={
-                                "filename": metadata["filename"],
-                                "author": metadata["author"],
-                                "chunk_index": chunk_index,
-                                "total_chunks": total_chunks,
-                                "chunk_char_count": chunk['char_count']
-                            }
-                        )
-                    
-                    chunks_stored += 1
-                    
+                    embeddings = self.embedding_generator.generate_embeddings(
+                        [chunk['text'] for chunk in chunks]
+                    )
                 except Exception as e:
-                    print(f"Failed to store chunk {chunk_index}: {e}")
-                    continue
+                    print(f"Failed to embed chunks: {e}")
+                    embeddings = []
+                
+                for chunk, embedding in zip(chunks, embeddings):
+                    items.append({
+                        "content": chunk['text'],
+                        "embedding": embedding,
+                        "source_url": source_url,
+                        "chunk_index": chunk['chunk_index'],
+                        "total_chunks": chunk['total_chunks'],
+                        "metadata": {
+                            "filename": metadata["filename"],
+                            "author": metadata["author"],
+                            "paragraphs": metadata["paragraphs"],
+                            "tables": metadata["tables"],
+                            "chunk_char_count": chunk['char_count']
+                        }
+                    })
+                
+                try:
+                    doc_ids = storage.store_documents_with_embeddings_bulk(
+                        client_id=client_id,
+                        items=items,
+                        source_type="docx",
+                        title=metadata["title"]
+                    )
+                    chunks_stored = len(doc_ids)
+                except Exception as e:
+                    print(f"Failed to store chunks: {e}")
+            else:
+                items = [
+                    {
+                        "content": chunk['text'],
+                        "source_url": source_url,
+                        "metadata": {
+                            "filename": metadata["filename"],
+                            "author": metadata["author"],
+                            "chunk_index": chunk['chunk_index'],
+                            "total_chunks": chunk['total_chunks'],
+                            "chunk_char_count": chunk['char_count']
+                        }
+                    }
+                    for chunk in chunks
+                ]
+                try:
+                    doc_ids = storage.store_documents_bulk(
+                        client_id=client_id,
+                        items=items,
+                        source_type="docx",
+                        title=metadata["title"]
+                    )
+                    chunks_stored = len(doc_ids)
+                except Exception as e:
+                    print(f"Failed to store chunks: {e}")
         
         return {
             "success": True,
@@ -4,6 +4,8 @@ Supports both local (sentence-transformers) and API-based embeddings.
 """
 
 from typing import List, Optional, Union, Dict
+from functools import lru_cache
+from pathlib import Path
 import os
 import numpy as np
 from enum import Enum
@@ -53,6 +55,14 @@ class EmbeddingGenerator:
             self._init_google(model_name)
         elif provider == EmbeddingProvider. OPENAI:
             self._init_openai(model_name)
+        
+        # Optional on-disk cache that survives restarts, one folder per model
+        self.disk_cache_dir = None
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR")
+        if cache_dir:
+            folder = f"{provider.value}-{self.model_name}".replace("/", "_")
+            self.disk_cache_dir = Path(cache_dir) / folder
+            self.disk_cache_dir.mkdir(parents=True, exist_ok=True)
     
     def _init_sentence_transformers(self, model_name: Optional[str] = None):
         """Initialize sentence-transformers (local embeddings)."""
@@ -71,6 +81,7 @@ class EmbeddingGenerator:
                 device = 'cpu'
                 print("💻 Using CPU (no GPU detected)")
             
+            self.model_name = model_name
             print(f"Loading sentence-transformers model: {model_name} on {device}")
             self.model = SentenceTransformer(model_name, device=device)
             self.dimension = self.model.get_sentence_embedding_dimension()
@@ -125,6 +136,31 @@ class EmbeddingGenerator:
                 "Install with: pip install openai"
             )
     
+    def _disk_cache_path(self, text: str) -> Path:
+        return self.disk_cache_dir / f"{hashlib.sha256(text.encode('utf-8')).hexdigest()}.npy"
+    
+    def _load_from_disk(self, text: str) -> Optional[List[float]]:
+        """Return the embedding cached on disk for this text, if any."""
+        if self.disk_cache_dir is None:
+            return None
+        try:
+            return np.load(self._disk_cache_path(text)).tolist()
+        except (OSError, ValueError):
+            return None
+    
+    def _save_to_disk(self, text: str, embedding: List[float]):
+        """Cache an embedding on disk; written to a temp file and renamed so readers never see a partial file."""
+        if self.disk_cache_dir is None:
+            return
+        path = self._disk_cache_path(text)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                np.save(f, np.asarray(embedding, dtype=np.float32))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    
     def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text with caching.
@@ -144,19 +180,24 @@ class EmbeddingGenerator:
             print(f"✓ Cache hit! (hits: {self.cache_hits}, misses: {self.cache_misses})")
             return self.cache[cache_key]
         
-        # Cache miss - generate embedding
-        self.cache_misses += 1
-        start_time = time.time()
-        
-        if self.provider == EmbeddingProvider.SENTENCE_TRANSFORMERS:
-            embedding = self._embed_sentence_transformers(text)
-        elif self.provider == EmbeddingProvider.GOOGLE:
-            embedding = self._embed_google(text)
-        elif self.provider == EmbeddingProvider.OPENAI:
-            embedding = self._embed_openai(text)
-        
-        elapsed = time.time() - start_time
-        print(f"✓ Embedding generated in {elapsed:.2f}s (hits: {self.cache_hits}, misses: {self.cache_misses})")
+        embedding = self._load_from_disk(text)
+        if embedding is not None:
+            self.cache_hits += 1
+        else:
+            # Cache miss - generate embedding
+            self.cache_misses += 1
+            start_time = time.time()
+            
+            if self.provider == EmbeddingProvider.SENTENCE_TRANSFORMERS:
+                embedding = self._embed_sentence_transformers(text)
+            elif self.provider == EmbeddingProvider.GOOGLE:
+                embedding = self._embed_google(text)
+            elif self.provider == EmbeddingProvider.OPENAI:
+                embedding = self._embed_openai(text)
+            
+            elapsed = time.time() - start_time
+            print(f"✓ Embedding generated in {elapsed:.2f}s (hits: {self.cache_hits}, misses: {self.cache_misses})")
+            self._save_to_disk(text, embedding)
         
         # Store in cache (limit cache size to 1000 entries)
         if len(self.cache) < 1000:
@@ -168,17 +209,51 @@ class EmbeddingGenerator:
         """
         Generate embeddings for multiple texts (batch).
         
+        Texts already in the memory or disk cache are served from it; the
+        rest are encoded in a single model call and added to the cache.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
             List of embedding vectors
         """
-        if self.provider == EmbeddingProvider.SENTENCE_TRANSFORMERS:
-            return self._embed_batch_sentence_transformers(texts)
-        else:
+        if self.provider != EmbeddingProvider.SENTENCE_TRANSFORMERS:
             # For API providers, process one by one (or implement batch API calls)
             return [self.generate_embedding(text) for text in texts]
+        
+        keys = [hashlib.md5(text.encode('utf-8')).hexdigest() for text in texts]
+        fresh = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in self.cache or key in fresh or key in missing:
+                continue
+            embedding = self._load_from_disk(text)
+            if embedding is not None:
+                fresh[key] = embedding
+            else:
+                missing[key] = text
+        
+        self.cache_hits += len(texts) - len(missing)
+        self.cache_misses += len(missing)
+        
+        if missing:
+            start_time = time.time()
+            generated = self._embed_batch_sentence_transformers(list(missing.values()))
+            elapsed = time.time() - start_time
+            print(f"✓ {len(generated)} embeddings generated in {elapsed:.2f}s (hits: {self.cache_hits}, misses: {self.cache_misses})")
+            
+            for (key, text), embedding in zip(missing.items(), generated):
+                fresh[key] = embedding
+                self._save_to_disk(text, embedding)
+        
+        # Store in cache (limit cache size to 1000 entries)
+        for key, embedding in fresh.items():
+            if len(self.cache) >= 1000:
+                break
+            self.cache[key] = embedding
+        
+        return [fresh[key] if key in fresh else self.cache[key] for key in keys]
     
     def _embed_sentence_transformers(self, text: str) -> List[float]:
         """Generate embedding using sentence-transformers."""
@@ -217,12 +292,16 @@ class EmbeddingGenerator:
 
 
 # Convenience functions
+@lru_cache(maxsize=4)
 def get_embedding_generator(
     provider: str = "sentence_transformers"
 ) -> EmbeddingGenerator:
     """
     Get an embedding generator instance.
     
+    Instances are cached per provider, so the model is loaded once per
+    process and shared by every processor, retriever and spider.
+    
     Args:
         provider: Provider name ("sentence_transformers", "google", "openai")
         
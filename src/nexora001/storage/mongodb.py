@@ -4,16 +4,142 @@ MongoDB storage operations for Nexora001 - Multi-Tenant Edition.
 
 from typing import List, Dict, Optional, Any
 from datetime import datetime
-from pymongo import MongoClient, ASCENDING
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pymongo import MongoClient, ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.operations import SearchIndexModel
 from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import ReadPreference
+from pymongo.write_concern import WriteConcern
 from bson import ObjectId
+import numpy as np
+import atexit
+import logging
+import math
 import os
 import secrets
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Indexes only need to be ensured once per process and database; every
+# later MongoDBStorage() would otherwise repeat the same round-trips.
+_INDEXED_DATABASES: set = set()  # (uri, database name)
+
+# IndexOptionsConflict / IndexKeySpecsConflict: an index with the same
+# name or keys already exists with different options; it is left as is
+INDEX_CONFLICT_CODES = (85, 86)
+
+@lru_cache(maxsize=8)
+def _get_client(uri: str, max_pool: int, min_pool: int) -> MongoClient:
+    """
+    Shared MongoClient per URI and pool size.
+    
+    MongoClient is thread-safe and owns its connection pool, so every
+    MongoDBStorage reuses one instead of reconnecting (TCP + TLS + auth).
+    """
+    return MongoClient(
+        uri,
+        compressors="zstd,zlib",  # Embedding payloads compress well on the wire
+        maxPoolSize=max_pool,
+        minPoolSize=min_pool,
+        maxIdleTimeMS=60000,
+        retryWrites=True,
+        appname="nexora001"
+    )
+
+@lru_cache(maxsize=4096)
+def _oid(value: str) -> ObjectId:
+    """Parse a user/client id once; the same ids are re-parsed on every request."""
+    return ObjectId(value)
+
+def _normalize(vec: List[float]) -> List[float]:
+    """Scale a vector to unit length so cosine similarity becomes a dot product."""
+    arr = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return (arr / norm).tolist() if norm else arr.tolist()
+
+# $dateToString format matching datetime.isoformat() (millisecond precision)
+ISO_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%L"
+
+def _encode_cursor(timestamp: datetime, doc_id: Any) -> str:
+    """Opaque keyset-pagination cursor for the last item of a page."""
+    return f"{timestamp.isoformat()}_{doc_id}"
+
+def _keyset_filter(field: str, cursor: str) -> Dict:
+    """
+    Match items strictly after `cursor` in (field desc, _id desc) order.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, _, doc_id = cursor.rpartition("_")
+    try:
+        timestamp, doc_id = datetime.fromisoformat(timestamp), ObjectId(doc_id)
+    except Exception:
+        raise ValueError(f"Invalid pagination cursor: {cursor}")
+    return {"$or": [
+        {field: {"$lt": timestamp}},
+        {field: timestamp, "_id": {"$lt": doc_id}}
+    ]}
+
+CHATBOT_SETTINGS_PROJECTION = {"chatbot_name": 1, "chatbot_greeting": 1, "chatbot_personality": 1}
+
+# Seconds to collect chat messages before writing them as one batch
+CHAT_FLUSH_INTERVAL = 0.05
+
+# Activity logs are purged in a daily batch after this many days
+ACTIVITY_LOG_RETENTION_DAYS = 90
+
+# Seconds to collect activity logs before writing them as one batch, and
+# the backlog size that triggers an immediate write
+ACTIVITY_LOG_FLUSH_INTERVAL = 0.2
+ACTIVITY_LOG_BATCH_SIZE = 1000
+
+# Seconds between batched API key last_used writes
+LAST_USED_FLUSH_INTERVAL = 5.0
+
+# Seconds before a failed write-behind batch is retried
+WRITE_BEHIND_RETRY_DELAY = 1.0
+
+# Validated API keys: key -> (client_id, key _id, expiry). Shared by every
+# MongoDBStorage in the process; entries expire so changes made by other
+# processes are picked up within the TTL.
+API_KEY_CACHE_TTL = 30.0
+_KEY_CACHE: Dict[str, tuple[str, ObjectId, float]] = {}
+_KEY_CACHE_BY_CLIENT: Dict[str, set] = {}
+_KEY_CACHE_LOCK = threading.Lock()
+
+def _invalidate_key_cache(client_id: Optional[str] = None):
+    """Forget cached keys for a client, or every cached key if none is given."""
+    with _KEY_CACHE_LOCK:
+        if client_id is None:
+            _KEY_CACHE.clear()
+            _KEY_CACHE_BY_CLIENT.clear()
+            return
+        for key in _KEY_CACHE_BY_CLIENT.pop(client_id, ()):
+            _KEY_CACHE.pop(key, None)
+
+# Data collection settings: client_id -> (settings, expiry). Read by the
+# widget on every chat; process-wide like the API key cache.
+SETTINGS_CACHE_TTL = 30.0
+_SETTINGS_CACHE: Dict[str, tuple[Dict[str, Any], float]] = {}
+_SETTINGS_CACHE_LOCK = threading.Lock()
+
+# get_stats results: client_id (None for all clients) -> (stats, expiry).
+# Dropped whenever this process writes the client's documents; the TTL
+# bounds staleness from other processes.
+STATS_CACHE_TTL = 30.0
+_STATS_CACHE: Dict[Optional[str], tuple[Dict[str, Any], float]] = {}
+_STATS_CACHE_LOCK = threading.Lock()
+
 class MongoDBStorage:
     def __init__(self, uri: Optional[str] = None, database: Optional[str] = None):
         self.uri = uri or os.getenv("MONGODB_URI")
@@ -22,7 +148,11 @@ class MongoDBStorage:
         if not self.uri:
             raise ValueError("MongoDB URI not provided")
         
-        self.client: MongoClient = MongoClient(self.uri)
+        self.client: MongoClient = _get_client(
+            self.uri,
+            int(os.getenv("MONGO_MAX_POOL", "100")),
+            int(os.getenv("MONGO_MIN_POOL", "10"))
+        )
         self.db: Database = self.client[self.database_name]
         
         # --- UPDATED COLLECTIONS ---
@@ -34,60 +164,153 @@ class MongoDBStorage:
         self.user_submissions: Collection = self.db["user_submissions"]  # FEATURE 2: User data submissions
         self.activity_logs: Collection = self.db["activity_logs"]  # PHASE 3: Activity logging
         
+        # Unacknowledged handle for best-effort counter updates
+        self._users_unacked: Collection = self.users.with_options(write_concern=WriteConcern(w=0))
+        self._documents_unacked: Collection = self.documents.with_options(write_concern=WriteConcern(w=0))
+        self._activity_logs_unacked: Collection = self.activity_logs.with_options(write_concern=WriteConcern(w=0))
+        
+        # Read-only handles for dashboard/audit reads that tolerate slightly
+        # stale data; they go to secondaries when there are any
+        read_only = {"read_preference": ReadPreference.SECONDARY_PREFERRED, "read_concern": ReadConcern("available")}
+        self._documents_ro: Collection = self.documents.with_options(**read_only)
+        self._activity_logs_ro: Collection = self.activity_logs.with_options(**read_only)
+        
+        # Per-client document counts for $vectorSearch sizing: (count, expiry)
+        self._doc_count_cache: Dict[str, tuple[int, float]] = {}
+        
+        # Source URLs already stored, keyed by client_id (see url_exists)
+        self._url_cache: Dict[str, set] = {}
+        
+        # Pending API key last_used timestamps, keyed by key _id
+        self._last_used: Dict[ObjectId, datetime] = {}
+        self._last_used_lock = threading.Lock()
+        self._last_used_timer: Optional[threading.Timer] = None
+        
+        # Pending chat messages, keyed by session_id
+        self._msg_buffer: Dict[str, List[Dict]] = {}
+        self._msg_lock = threading.Lock()
+        self._msg_timer: Optional[threading.Timer] = None
+        
+        # Pending activity log entries (see log_activity)
+        self._log_buffer: List[Dict] = []
+        self._log_lock = threading.Lock()
+        self._log_timer: Optional[threading.Timer] = None
+        
         self._create_indexes()
     
     def _create_indexes(self):
-        """Create indexes safely, handling conflicts."""
-        try:
-            # NEW: Filter by client_id first, then source_url
-            self.documents.create_index([("client_id", ASCENDING), ("metadata.source_url", ASCENDING)])
-        except Exception:
-            pass  # Index already exists
+        """Create indexes best-effort; failures are logged, never raised."""
+        if (self.uri, self.database_name) in _INDEXED_DATABASES:
+            return
         
         try:
-            self.users.create_index("email", unique=True)
-        except Exception:
-            pass
+            self._build_indexes()
+        except PyMongoError as e:
+            # e.g. the server is unreachable; not marked as done, so the
+            # next MongoDBStorage() tries again
+            logger.warning("Skipping index creation on %s: %s", self.database_name, e)
+            return
         
-        try:
-            self.api_keys.create_index("key", unique=True)
-        except Exception:
-            pass
+        _INDEXED_DATABASES.add((self.uri, self.database_name))
+    
+    def _build_indexes(self):
+        """Create and clean up indexes, logging any that cannot be built."""
+        # One createIndexes round trip per collection
+        self._ensure_indexes(self.documents, [
+            # NEW: Filter by client_id first, then source_url
+            IndexModel([("client_id", ASCENDING), ("metadata.source_url", ASCENDING)]),
+            # Only embedding-carrying chunks, matching the vector search fallback filter
+            IndexModel(
+                [("client_id", ASCENDING)],
+                partialFilterExpression={"embedding": {"$exists": True}},
+                name="client_with_embedding"
+            ),
+            # Newest-first document listings per client
+            IndexModel([("client_id", ASCENDING), ("metadata.crawled_at", DESCENDING)])
+        ])
+        self._ensure_indexes(self.users, [IndexModel("email", unique=True)])
+        self._ensure_indexes(self.api_keys, [IndexModel("key", unique=True)])
+        self._ensure_indexes(self.crawl_jobs, [
+            # Newest-first job history per client walks the index in order
+            IndexModel([("client_id", ASCENDING), ("started_at", DESCENDING)])
+        ])
+        self._ensure_indexes(self.chat_sessions, [IndexModel("session_id", unique=True)])
+        # Keyset pagination walks (timestamp, _id) newest-first
+        self._ensure_indexes(self.user_submissions, [
+            IndexModel([("client_id", ASCENDING), ("submitted_at", DESCENDING), ("_id", DESCENDING)])
+        ])
+        self._ensure_indexes(self.activity_logs, [
+            # Trailing action_type lets get_user_activity_summary's $group
+            # run as a covered index scan
+            IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("action_type", ASCENDING)]),
+            # Platform-wide log listing, per-type analytics over a date range
+            # and the daily retention purge all filter on timestamp alone.
+            # It takes the place of the dropped TTL index, so inserts maintain
+            # as many indexes as before the purge change, not one more.
+            IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING), ("action_type", ASCENDING)])
+        ])
+        self._ensure_indexes(self.db["notifications"], [
+            # Recent-first notification feed per user
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+            # Unread-only lookups stay small via a partial index
+            IndexModel(
+                [("user_id", ASCENDING), ("read", ASCENDING), ("created_at", DESCENDING)],
+                partialFilterExpression={"read": False}
+            )
+        ])
         
         try:
-            self.crawl_jobs.create_index([("client_id", ASCENDING)])
+            # Superseded by the (client_id, started_at) index
+            self.crawl_jobs.drop_index("client_id_1")
         except Exception:
-            pass
+            pass  # Already dropped
         
-        try:
-            self.chat_sessions.create_index("session_id", unique=True)
-        except Exception:
-            pass
+        # Superseded by the keyset pagination indexes
+        for collection, name in (
+            (self.user_submissions, "client_id_1_submitted_at_1"),
+            (self.activity_logs, "user_id_1_timestamp_1"),
+        ):
+            try:
+                collection.drop_index(name)
+            except Exception:
+                pass  # Already dropped
         
         try:
-            self.user_submissions.create_index([("client_id", ASCENDING), ("submitted_at", ASCENDING)])
+            # Retention is handled by purge_old_activity_logs(); the old TTL
+            # index made every log insert maintain an extra index
+            self.activity_logs.drop_index("timestamp_1")
         except Exception:
-            pass
+            pass  # Already dropped
         
+        # For last_active, keep the existing index with TTL if it exists.
+        # create_index is a no-op when the options match; one created with
+        # different options raises a conflict, which we leave untouched.
         try:
-            self.activity_logs.create_index([("user_id", ASCENDING), ("timestamp", ASCENDING)])
-        except Exception:
-            pass
-        
+            self.chat_sessions.create_index("last_active", expireAfterSeconds=86400, name="last_active_1")
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                logger.warning("Could not create index last_active_1 on chat_sessions: %s", e)
+
+    @staticmethod
+    def _ensure_indexes(collection: Collection, models: List[IndexModel]):
+        """Create a collection's indexes in one call, isolating conflicts."""
         try:
-            self.activity_logs.create_index("timestamp", expireAfterSeconds=7776000)  # 90 days retention
-        except Exception:
-            pass
+            collection.create_indexes(models)
+            return
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                # e.g. no createIndex privilege; retrying one by one won't help
+                logger.warning("Could not create indexes on %s: %s", collection.name, e)
+                return
         
-        # For last_active, keep the existing index with TTL if it exists
-        # Don't try to recreate it
-        try:
-            existing_indexes = self.chat_sessions.index_information()
-            if "last_active_1" not in existing_indexes:
-                # Only create if it doesn't exist at all
-                self.chat_sessions.create_index("last_active", expireAfterSeconds=86400)
-        except Exception:
-            pass  # Index exists or cannot be created
+        # The batch fails as a whole if any index conflicts with an
+        # existing one; retry individually so the others still get built
+        for model in models:
+            try:
+                collection.create_indexes([model])
+            except OperationFailure as e:
+                if e.code not in INDEX_CONFLICT_CODES:
+                    logger.warning("Could not create index %s on %s: %s", model.document["name"], collection.name, e)
 
     # ==========================================
     # 1. AUTH & USER MANAGEMENT
@@ -103,10 +326,36 @@ class MongoDBStorage:
             # Chatbot customization defaults
             "chatbot_name": "AI Assistant",
             "chatbot_greeting": "Hello! How can I help you today?",
-            "chatbot_personality": "friendly and helpful"
+            "chatbot_personality": "friendly and helpful",
+            # Materialized usage counters (see reconcile_user_counts)
+            "doc_count": 0,
+            "api_key_count": 0
         }
         return str(self.users.insert_one(user).inserted_id)
 
+    def _inc_user_counter(self, client_id: str, field: str, amount: int):
+        """Fire-and-forget $inc of a materialized per-user counter."""
+        if not amount:
+            return
+        try:
+            # Users without the field yet are left to the backfill in
+            # get_all_users(); $inc would otherwise start them from 0
+            self._users_unacked.update_one(
+                {"_id": _oid(client_id), field: {"$exists": True}},
+                {"$inc": {field: amount}}
+            )
+        except Exception:
+            pass  # Drift is corrected by reconcile_user_counts()
+
+    def _documents_changed(self, client_id: str, amount: int):
+        """Account for documents added (or removed, if negative) for a client."""
+        if not amount:
+            return
+        self._inc_user_counter(client_id, "doc_count", amount)
+        with _STATS_CACHE_LOCK:
+            _STATS_CACHE.pop(client_id, None)
+            _STATS_CACHE.pop(None, None)
+
     def update_user_profile(self, user_id: str, updates: Dict) -> bool:
             """Update user details (name, email, etc)."""
             # Protect against changing role/id/password via this simple method
@@ -114,25 +363,36 @@ class MongoDBStorage:
             if not safe_updates: return False
             
             result = self.users.update_one(
-                {"_id": ObjectId(user_id)},
+                {"_id": _oid(user_id)},
                 {"$set": safe_updates}
             )
-            return result.modified_count > 0
+            return result.matched_count > 0
 
     def get_user_by_id(self, user_id: str) -> Optional[Dict]:
-        return self.users.find_one({"_id": ObjectId(user_id)})
+        return self.users.find_one({"_id": _oid(user_id)})
 
-    def update_chatbot_settings(self, client_id: str, settings: Dict) -> bool:
-        """Update chatbot customization settings for a client."""
-        result = self.users.update_one(
-            {"_id": ObjectId(client_id)},
-            {"$set": settings}
+    def update_chatbot_settings(self, client_id: str, settings: Dict) -> Optional[Dict]:
+        """
+        Update chatbot customization settings for a client.
+        
+        Returns:
+            The updated settings (with defaults), or None if the client doesn't exist
+        """
+        user = self.users.find_one_and_update(
+            {"_id": _oid(client_id)},
+            {"$set": settings},
+            projection=CHATBOT_SETTINGS_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
-        return result.modified_count > 0
+        return self._chatbot_settings_with_defaults(user)
 
     def get_chatbot_settings(self, client_id: str) -> Optional[Dict]:
         """Retrieve chatbot settings for a client with defaults."""
-        user = self.users.find_one({"_id": ObjectId(client_id)})
+        user = self.users.find_one({"_id": _oid(client_id)}, CHATBOT_SETTINGS_PROJECTION)
+        return self._chatbot_settings_with_defaults(user)
+
+    @staticmethod
+    def _chatbot_settings_with_defaults(user: Optional[Dict]) -> Optional[Dict]:
         if not user:
             return None
         
@@ -171,34 +431,34 @@ class MongoDBStorage:
             "revoked_at": None,
             "revoked_by": None
         })
+        self._inc_user_counter(client_id, "api_key_count", 1)
         return key
     
     def list_user_api_keys(self, client_id: str) -> List[Dict]:
         """Get all API keys for a user."""
-        keys = list(self.api_keys.find(
-            {"client_id": client_id}
-        ).sort("created_at", -1))
-        
-        for key in keys:
-            key["_id"] = str(key["_id"])
-            # Handle legacy keys without new schema fields
-            if "name" not in key:
-                key["name"] = "Legacy API Key"
-            if "key_prefix" not in key and "key" in key:
-                key["key_prefix"] = key["key"][:10] + "..."
-            if "status" not in key:
-                key["status"] = "active"
-            # Format dates
-            if key.get("created_at"):
-                key["created_at"] = key["created_at"].isoformat() if hasattr(key["created_at"], "isoformat") else str(key["created_at"])
-            if key.get("last_used"):
-                key["last_used"] = key["last_used"].isoformat() if hasattr(key["last_used"], "isoformat") else str(key["last_used"])
-            if key.get("revoked_at"):
-                key["revoked_at"] = key["revoked_at"].isoformat() if hasattr(key["revoked_at"], "isoformat") else str(key["revoked_at"])
-            # Remove the actual key from response for security
-            key.pop("key", None)
-        
-        return keys
+        # Shape the response server-side; the actual key never leaves the
+        # database (only its prefix), for security
+        pipeline = [
+            {"$match": {"client_id": client_id}},
+            {"$sort": {"created_at": -1}},
+            {"$project": {
+                "_id": {"$toString": "$_id"},
+                "client_id": 1,
+                "revoked_by": 1,
+                # Handle legacy keys without new schema fields
+                "name": {"$ifNull": ["$name", "Legacy API Key"]},
+                "status": {"$ifNull": ["$status", "active"]},
+                "key_prefix": {"$ifNull": [
+                    "$key_prefix",
+                    {"$concat": [{"$substrCP": ["$key", 0, 10]}, "..."]}
+                ]},
+                # Format dates
+                "created_at": {"$dateToString": {"date": "$created_at", "format": ISO_DATE_FORMAT}},
+                "last_used": {"$dateToString": {"date": "$last_used", "format": ISO_DATE_FORMAT}},
+                "revoked_at": {"$dateToString": {"date": "$revoked_at", "format": ISO_DATE_FORMAT}}
+            }}
+        ]
+        return list(self.api_keys.aggregate(pipeline))
     
     def get_api_key_details(self, key_id: str, client_id: str) -> Optional[Dict]:
         """Get full details of a specific API key including the actual key value."""
@@ -211,11 +471,13 @@ class MongoDBStorage:
     def delete_api_key(self, key_id: str, client_id: str) -> bool:
         """Permanently delete an API key (client admin action)."""
         result = self.api_keys.delete_one({"_id": ObjectId(key_id), "client_id": client_id})
+        self._inc_user_counter(client_id, "api_key_count", -result.deleted_count)
+        _invalidate_key_cache(client_id)
         return result.deleted_count > 0
     
     def revoke_api_key(self, key_id: str, admin_id: str, notification_msg: str = None) -> bool:
         """Revoke an API key (super admin action). Keeps in DB but makes unusable."""
-        result = self.api_keys.update_one(
+        key_doc = self.api_keys.find_one_and_update(
             {"_id": ObjectId(key_id)},
             {
                 "$set": {
@@ -223,29 +485,25 @@ class MongoDBStorage:
                     "revoked_at": datetime.utcnow(),
                     "revoked_by": admin_id
                 }
-            }
+            },
+            projection={"client_id": 1},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count > 0:
-            # Get the key to find client_id and send notification
-            key_doc = self.api_keys.find_one({"_id": ObjectId(key_id)})
-            if key_doc:
-                msg = notification_msg or "Your API key was revoked. Please contact admins for more information."
-                self.create_notification(key_doc["client_id"], msg, "warning")
+        if key_doc:
+            _invalidate_key_cache(key_doc["client_id"])
+            msg = notification_msg or "Your API key was revoked. Please contact admins for more information."
+            self.create_notification(key_doc["client_id"], msg, "warning")
         
-        return result.modified_count > 0
+        return key_doc is not None
     
     def regenerate_api_key(self, key_id: str, client_id: str) -> Optional[str]:
         """Regenerate an API key (keeps same name and metadata)."""
-        old_key = self.api_keys.find_one({"_id": ObjectId(key_id), "client_id": client_id})
-        if not old_key:
-            return None
-        
         new_key = f"nx_{secrets.token_urlsafe(24)}"
         new_key_prefix = new_key[:10] + "..."
         
-        self.api_keys.update_one(
-            {"_id": ObjectId(key_id)},
+        doc = self.api_keys.find_one_and_update(
+            {"_id": ObjectId(key_id), "client_id": client_id},
             {
                 "$set": {
                     "key": new_key,
@@ -256,8 +514,14 @@ class MongoDBStorage:
                     "revoked_at": None,
                     "revoked_by": None
                 }
-            }
+            },
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
         )
+        if doc is None:
+            return None
+        
+        _invalidate_key_cache(client_id)
         return new_key
     
     def update_api_key_name(self, key_id: str, client_id: str, new_name: str) -> bool:
@@ -266,150 +530,205 @@ class MongoDBStorage:
             {"_id": ObjectId(key_id), "client_id": client_id},
             {"$set": {"name": new_name}}
         )
-        return result.modified_count > 0
+        return result.matched_count > 0
 
     def validate_api_key(self, key: str) -> Optional[str]:
         """Validate API key and return client_id if valid and active."""
-        doc = self.api_keys.find_one({"key": key})
-        if doc:
-            # Check if key is active
-            if doc.get("status") != "active":
-                return None
-            
+        now = time.monotonic()
+        with _KEY_CACHE_LOCK:
+            cached = _KEY_CACHE.get(key)
+        if cached and now < cached[2]:
+            client_id, key_id, _ = cached
+            self._touch_api_key(key_id)
+            return client_id
+        
+        # Join the key with its owner's status in a single round-trip
+        pipeline = [
+            # Legacy keys have no status and are listed as active (see
+            # list_user_api_keys); None also matches a missing field
+            {"$match": {"key": key, "status": {"$in": ["active", None]}}},
+            {"$limit": 1},
+            {"$lookup": {
+                "from": "users",
+                "let": {"cid": {"$toObjectId": "$client_id"}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$cid"]}}},
+                    {"$project": {"status": 1}}
+                ],
+                "as": "owner"
+            }},
             # Check if user is banned
-            user = self.users.find_one({"_id": ObjectId(doc['client_id'])})
-            if user and user.get('status') == 'banned':
-                return None
-            
-            # Update last_used timestamp
-            self.api_keys.update_one(
-                {"_id": doc["_id"]},
-                {"$set": {"last_used": datetime.utcnow()}}
-            )
+            {"$match": {"owner.status": {"$ne": "banned"}}},
+            {"$project": {"client_id": 1}}
+        ]
+        doc = next(self.api_keys.aggregate(pipeline), None)
+        if doc:
+            with _KEY_CACHE_LOCK:
+                _KEY_CACHE[key] = (doc["client_id"], doc["_id"], now + API_KEY_CACHE_TTL)
+                _KEY_CACHE_BY_CLIENT.setdefault(doc["client_id"], set()).add(key)
             
+            self._touch_api_key(doc["_id"])
             return doc['client_id']
         return None
+    
+    def _touch_api_key(self, key_id: ObjectId):
+        """Update last_used timestamp (write-behind, see flush_last_used)."""
+        with self._last_used_lock:
+            self._last_used[key_id] = datetime.utcnow()
+            if self._last_used_timer is None:
+                self._last_used_timer = threading.Timer(LAST_USED_FLUSH_INTERVAL, self.flush_last_used)
+                self._last_used_timer.daemon = True
+                self._last_used_timer.start()
+    
+    def flush_last_used(self):
+        """Write buffered API key last_used timestamps in a single round-trip."""
+        with self._last_used_lock:
+            pending, self._last_used = self._last_used, {}
+            if self._last_used_timer is not None:
+                self._last_used_timer.cancel()
+                self._last_used_timer = None
+        
+        if not pending:
+            return
+        
+        try:
+            self.api_keys.bulk_write(
+                [UpdateOne({"_id": key_id}, {"$set": {"last_used": ts}}) for key_id, ts in pending.items()],
+                ordered=False
+            )
+        except Exception:
+            logger.exception("Failed to write last_used for %d API keys; will retry", len(pending))
+            with self._last_used_lock:
+                for key_id, ts in pending.items():
+                    self._last_used.setdefault(key_id, ts)  # Keep newer timestamps
+                if self._last_used_timer is None:
+                    self._last_used_timer = threading.Timer(WRITE_BEHIND_RETRY_DELAY, self.flush_last_used)
+                    self._last_used_timer.daemon = True
+                    self._last_used_timer.start()
 
     # ==========================================
     # 3. SUPER ADMIN ACTIONS
     # ==========================================
 
-    def get_all_users(self) -> List[Dict]:
-        users = list(self.users.find({}, {"password_hash": 0}))
-        for user in users:
-            uid = str(user["_id"])
-            user["doc_count"] = self.documents.count_documents({"client_id": uid})
-            user["api_keys"] = self.api_keys.count_documents({"client_id": uid})
-        return users
-    
     def calculate_user_storage(self, client_id: str) -> Dict[str, Any]:
         """Calculate total storage used by user (all data types)."""
+        return self._calculate_storage([client_id])[client_id]
+    
+    def _calculate_storage(self, client_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Storage breakdown for several clients at once.
+        
+        Each collection is measured with one grouped aggregation covering all
+        the given clients, so the cost does not grow with the number of users.
+        """
         try:
-            import sys
-            
-            # 1. Document files (actual uploaded files)
-            docs = list(self.documents.find({"client_id": client_id}))
-            doc_size = sum(doc.get("file_size", 0) for doc in docs)
-            doc_count = len(docs)
-            
-            # 2. Qdrant vectors (embeddings)
-            vector_count = 0
-            vector_size = 0
-            try:
-                from qdrant_client import QdrantClient
-                qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-                qdrant = QdrantClient(url=qdrant_url)
-                collection_name = f"client_{client_id}"
-                collection_info = qdrant.get_collection(collection_name)
-                vector_count = collection_info.vectors_count or 0
-                # Estimate: ~1KB per vector (768 dimensions * 4 bytes + metadata)
-                vector_size = vector_count * 1024
-            except Exception:
-                pass  # Collection doesn't exist or Qdrant unavailable
+            # 1. Document files (actual uploaded files) and the stored chunks
+            #    themselves, measured in one server-side pass
+            doc_usage = self._usage_by_client(self.documents, client_ids, {
+                "file_bytes": {"$sum": "$file_size"}  # $sum skips missing/null values
+            })
             
             # 3. Chat sessions (conversation history)
-            chat_sessions = list(self.chat_sessions.find({"client_id": client_id}))
-            chat_size = sum(sys.getsizeof(str(session)) for session in chat_sessions)
-            chat_count = len(chat_sessions)
+            chat_usage = self._usage_by_client(self.chat_sessions, client_ids)
             
             # 4. Crawl jobs (scraped web content)
-            crawl_jobs = list(self.crawl_jobs.find({"client_id": client_id}))
-            crawl_size = sum(sys.getsizeof(str(job)) for job in crawl_jobs)
-            crawl_count = len(crawl_jobs)
+            crawl_usage = self._usage_by_client(self.crawl_jobs, client_ids)
             
             # 5. User submissions (form data from Feature 2)
-            submissions = list(self.user_submissions.find({"client_id": client_id}))
-            submission_size = sum(sys.getsizeof(str(sub)) for sub in submissions)
-            submission_count = len(submissions)
-            
-            # 6. Document metadata and chunks (stored in MongoDB)
-            # Estimate: Each document has chunks stored as text
-            metadata_size = 0
-            for doc in docs:
-                # Chunks are typically stored in document or separate collection
-                chunks = doc.get("chunks", [])
-                metadata_size += sys.getsizeof(str(chunks))
-            
-            # Calculate totals
-            total_bytes = (
-                doc_size +           # Actual files
-                vector_size +        # Qdrant vectors
-                chat_size +          # Chat history
-                crawl_size +         # Crawled content
-                submission_size +    # Form submissions
-                metadata_size        # Chunks & metadata
-            )
-            total_mb = round(total_bytes / (1024 * 1024), 2)
-            
-            return {
-                "total_bytes": total_bytes,
-                "total_mb": total_mb,
-                "documents_bytes": doc_size,
-                "vectors_bytes": vector_size,
-                "chat_sessions_bytes": chat_size,
-                "crawl_jobs_bytes": crawl_size,
-                "submissions_bytes": submission_size,
-                "metadata_bytes": metadata_size,
-                "vector_count": vector_count,
-                "document_count": doc_count,
-                "chat_session_count": chat_count,
-                "crawl_job_count": crawl_count,
-                "submission_count": submission_count,
-                "breakdown": {
-                    "documents": f"{round(doc_size / (1024 * 1024), 2)} MB",
-                    "vectors": f"{round(vector_size / (1024 * 1024), 2)} MB",
-                    "chats": f"{round(chat_size / (1024 * 1024), 2)} MB",
-                    "crawls": f"{round(crawl_size / (1024 * 1024), 2)} MB",
-                    "submissions": f"{round(submission_size / (1024 * 1024), 2)} MB",
-                    "metadata": f"{round(metadata_size / (1024 * 1024), 2)} MB"
-                }
-            }
-        except Exception as e:
+            submission_usage = self._usage_by_client(self.user_submissions, client_ids)
+        except Exception:
             # Return empty stats on error
-            return {
-                "total_bytes": 0,
-                "total_mb": 0.0,
-                "documents_bytes": 0,
-                "vectors_bytes": 0,
-                "chat_sessions_bytes": 0,
-                "crawl_jobs_bytes": 0,
-                "submissions_bytes": 0,
-                "metadata_bytes": 0,
-                "vector_count": 0,
-                "document_count": 0,
-                "chat_session_count": 0,
-                "crawl_job_count": 0,
-                "submission_count": 0,
-                "breakdown": {}
+            return {client_id: {**self._storage_summary({}, 0, {}, {}, {}), "breakdown": {}} for client_id in client_ids}
+        
+        # 2. Qdrant vectors (embeddings), via the process-wide Qdrant client
+        vector_counts = {}
+        if os.getenv("USE_QDRANT", "false").lower() == "true":
+            try:
+                from nexora001.storage.qdrant_storage import get_qdrant
+                qdrant = get_qdrant()
+                for client_id in client_ids:
+                    vector_counts[client_id] = qdrant.count_vectors(client_id)
+            except Exception:
+                pass  # Qdrant unavailable
+        
+        return {
+            client_id: self._storage_summary(
+                doc_usage.get(client_id, {}),
+                vector_counts.get(client_id, 0),
+                chat_usage.get(client_id, {}),
+                crawl_usage.get(client_id, {}),
+                submission_usage.get(client_id, {})
+            )
+            for client_id in client_ids
+        }
+    
+    @staticmethod
+    def _storage_summary(doc_usage: Dict, vector_count: int, chat_usage: Dict, crawl_usage: Dict, submission_usage: Dict) -> Dict[str, Any]:
+        """Assemble the storage breakdown returned by calculate_user_storage."""
+        doc_size = doc_usage.get("file_bytes", 0)
+        # Estimate: ~1KB per vector (768 dimensions * 4 bytes + metadata)
+        vector_size = vector_count * 1024
+        chat_size = chat_usage.get("bytes", 0)
+        crawl_size = crawl_usage.get("bytes", 0)
+        submission_size = submission_usage.get("bytes", 0)
+        # 6. Document metadata and chunks (stored in MongoDB)
+        metadata_size = doc_usage.get("bytes", 0)
+        
+        # Calculate totals
+        total_bytes = (
+            doc_size +           # Actual files
+            vector_size +        # Qdrant vectors
+            chat_size +          # Chat history
+            crawl_size +         # Crawled content
+            submission_size +    # Form submissions
+            metadata_size        # Chunks & metadata
+        )
+        total_mb = round(total_bytes / (1024 * 1024), 2)
+        
+        return {
+            "total_bytes": total_bytes,
+            "total_mb": total_mb,
+            "documents_bytes": doc_size,
+            "vectors_bytes": vector_size,
+            "chat_sessions_bytes": chat_size,
+            "crawl_jobs_bytes": crawl_size,
+            "submissions_bytes": submission_size,
+            "metadata_bytes": metadata_size,
+            "vector_count": vector_count,
+            "document_count": doc_usage.get("count", 0),
+            "chat_session_count": chat_usage.get("count", 0),
+            "crawl_job_count": crawl_usage.get("count", 0),
+            "submission_count": submission_usage.get("count", 0),
+            "breakdown": {
+                "documents": f"{round(doc_size / (1024 * 1024), 2)} MB",
+                "vectors": f"{round(vector_size / (1024 * 1024), 2)} MB",
+                "chats": f"{round(chat_size / (1024 * 1024), 2)} MB",
+                "crawls": f"{round(crawl_size / (1024 * 1024), 2)} MB",
+                "submissions": f"{round(submission_size / (1024 * 1024), 2)} MB",
+                "metadata": f"{round(metadata_size / (1024 * 1024), 2)} MB"
             }
+        }
+    
+    @staticmethod
+    def _usage_by_client(collection: Collection, client_ids: List[str], extra: Optional[Dict] = None) -> Dict[str, Dict[str, int]]:
+        """BSON bytes and document count (plus any extra $group sums) per client."""
+        pipeline = [
+            {"$match": {"client_id": {"$in": client_ids}}},
+            {"$group": {
+                "_id": "$client_id",
+                "bytes": {"$sum": {"$bsonSize": "$$ROOT"}},
+                "count": {"$sum": 1},
+                **(extra or {})
+            }}
+        ]
+        return {usage.pop("_id"): usage for usage in collection.aggregate(pipeline)}
     
     def get_all_users_with_storage(self) -> List[Dict]:
         """Get all users with storage calculations included."""
-        users = list(self.users.find({}, {"password_hash": 0}))
+        users = self.get_all_users()
+        storage = self._calculate_storage([str(user["_id"]) for user in users])
         for user in users:
-            uid = str(user["_id"])
-            user["api_keys"] = self.api_keys.count_documents({"client_id": uid})
-            user["storage"] = self.calculate_user_storage(uid)
+            user["storage"] = storage[str(user["_id"])]
         return users
 
     def set_user_status(self, email: str, status: str) -> bool:
@@ -418,11 +737,13 @@ class MongoDBStorage:
             {"email": email},
             {"$set": {"status": status}}
         )
-        return result.modified_count > 0
+        _invalidate_key_cache()  # Owner status is baked into cached keys
+        return result.matched_count > 0
 
     def delete_user_full(self, email: str) -> int:
         """
-        Hard Delete: Removes User + Documents + Keys + Jobs + Chats.
+        Hard Delete: Removes User + Documents + Keys + Jobs + Chats
+        + Submissions + Activity Logs + Notifications (+ Qdrant vectors).
         Returns total deleted count.
         """
         user = self.users.find_one({"email": email})
@@ -430,20 +751,90 @@ class MongoDBStorage:
         
         uid = str(user["_id"])
         
-        # Cascade delete
-        d1 = self.documents.delete_many({"client_id": uid}).deleted_count
-        d2 = self.api_keys.delete_many({"client_id": uid}).deleted_count
-        d3 = self.crawl_jobs.delete_many({"client_id": uid}).deleted_count
-        d4 = self.users.delete_one({"_id": user["_id"]}).deleted_count
+        # Cascade delete - the collections are independent, so fan the
+        # deletes out in parallel instead of paying one round-trip each
+        cascade = [
+            (self.documents, {"client_id": uid}),
+            (self.api_keys, {"client_id": uid}),
+            (self.crawl_jobs, {"client_id": uid}),
+            (self.chat_sessions, {"client_id": uid}),
+            (self.user_submissions, {"client_id": uid}),
+            (self.activity_logs, {"user_id": uid}),
+            (self.db["notifications"], {"user_id": uid})
+        ]
+        with ThreadPoolExecutor(max_workers=len(cascade)) as pool:
+            futures = [pool.submit(coll.delete_many, query) for coll, query in cascade]
+            deleted = sum(f.result().deleted_count for f in futures)
         
-        return d1 + d2 + d3 + d4
+        if os.getenv("USE_QDRANT", "false").lower() == "true":
+            try:
+                from nexora001.storage.qdrant_storage import get_qdrant
+                get_qdrant().delete_by_client(uid)
+            except Exception:
+                pass  # Qdrant unavailable; vectors are filtered by client_id anyway
+        
+        self._url_cache.pop(uid, None)
+        _invalidate_key_cache(uid)
+        with _SETTINGS_CACHE_LOCK:
+            _SETTINGS_CACHE.pop(uid, None)
+        with _STATS_CACHE_LOCK:
+            _STATS_CACHE.pop(uid, None)
+            _STATS_CACHE.pop(None, None)
+        
+        # Remove the user last so a failed cascade can be retried
+        deleted += self.users.delete_one({"_id": user["_id"]}).deleted_count
+        
+        return deleted
 
     # ==========================================
     # 4. DOCUMENT MANAGEMENT
     # ==========================================
     def store_document(self, client_id: str, content: str, source_url: str, source_type: str = "web", title: str = None, metadata: Dict = None) -> str:
         # NOTICE: client_id is now the FIRST required argument
-        doc = {
+        doc = self._plain_document(client_id, content, source_url, source_type, title, metadata)
+        doc_id = str(self.documents.insert_one(doc).inserted_id)
+        self._documents_changed(client_id, 1)
+        if client_id in self._url_cache:
+            self._url_cache[client_id].add(doc["metadata"]["source_url"])
+        return doc_id
+
+    def store_documents_bulk(self, client_id: str, items: List[Dict], source_type: str = "web", title: str = None) -> List[str]:
+        """
+        Store many chunks without embeddings with a single insert_many.
+        
+        Args:
+            client_id: Client ID for data isolation
+            items: Dicts with content, source_url and optionally title, metadata
+            source_type: Source type applied to every chunk
+            title: Default title for items without their own
+            
+        Returns:
+            Inserted document IDs, in item order
+        """
+        if not items:
+            return []
+        
+        docs = [
+            self._plain_document(
+                client_id,
+                item["content"],
+                item["source_url"],
+                source_type,
+                item.get("title", title),
+                item.get("metadata")
+            )
+            for item in items
+        ]
+        result = self.documents.insert_many(docs, ordered=False)
+        
+        self._documents_changed(client_id, len(docs))
+        if client_id in self._url_cache:
+            self._url_cache[client_id].update(doc["metadata"]["source_url"] for doc in docs)
+        return [str(doc_id) for doc_id in result.inserted_ids]
+
+    @staticmethod
+    def _plain_document(client_id: str, content: str, source_url: str, source_type: str, title: Optional[str], metadata: Optional[Dict]) -> Dict:
+        return {
             "client_id": client_id,  # <--- DATA ISOLATION
             "content": content,
             "metadata": {
@@ -451,16 +842,66 @@ class MongoDBStorage:
                 "source_type": source_type,
                 "title": title or source_url,
                 "crawled_at": datetime.utcnow(),
+                "content_length": len(content),
                 **(metadata or {})
             }
         }
-        return str(self.documents.insert_one(doc).inserted_id)
 
     def store_document_with_embedding(self, client_id: str, content: str, embedding: List[float], source_url: str, source_type: str = "web", title: str = None, chunk_index: int = 0, total_chunks: int = 1, metadata: Dict = None) -> str:
-        doc = {
+        doc = self._embedded_document(client_id, content, embedding, source_url, source_type, title, chunk_index, total_chunks, metadata)
+        doc_id = str(self.documents.insert_one(doc).inserted_id)
+        self._documents_changed(client_id, 1)
+        if client_id in self._url_cache:
+            self._url_cache[client_id].add(doc["metadata"]["source_url"])
+        return doc_id
+
+    def store_documents_with_embeddings_bulk(self, client_id: str, items: List[Dict], source_type: str = "web", title: str = None, fast_insert: bool = False) -> List[str]:
+        """
+        Store many embedded chunks with a single insert_many.
+        
+        Args:
+            client_id: Client ID for data isolation
+            items: Dicts with content, embedding, source_url and optionally
+                title, chunk_index, total_chunks, metadata
+            source_type: Source type applied to every chunk
+            title: Default title for items without their own
+            fast_insert: Skip write acknowledgement (bulk crawl ingest only)
+            
+        Returns:
+            Inserted document IDs, in item order
+        """
+        if not items:
+            return []
+        
+        docs = [
+            self._embedded_document(
+                client_id,
+                item["content"],
+                item["embedding"],
+                item["source_url"],
+                source_type,
+                item.get("title", title),
+                item.get("chunk_index", 0),
+                item.get("total_chunks", 1),
+                item.get("metadata")
+            )
+            for item in items
+        ]
+        collection = self._documents_unacked if fast_insert else self.documents
+        result = collection.insert_many(docs, ordered=False)
+        
+        self._documents_changed(client_id, len(docs))
+        if client_id in self._url_cache:
+            self._url_cache[client_id].update(doc["metadata"]["source_url"] for doc in docs)
+        return [str(doc_id) for doc_id in result.inserted_ids]
+
+    @staticmethod
+    def _embedded_document(client_id: str, content: str, embedding: List[float], source_url: str, source_type: str, title: Optional[str], chunk_index: int, total_chunks: int, metadata: Optional[Dict]) -> Dict:
+        return {
             "client_id": client_id,  # <--- DATA ISOLATION
             "content": content,
-            "embedding": embedding,
+            "embedding": _normalize(embedding),
+            "embedding_normalized": True,
             "metadata": {
                 "source_url": source_url,
                 "source_type": source_type,
@@ -468,10 +909,10 @@ class MongoDBStorage:
                 "crawled_at": datetime.utcnow(),
                 "chunk_index": chunk_index,
                 "total_chunks": total_chunks,
+                "content_length": len(content),
                 **(metadata or {})
             }
         }
-        return str(self.documents.insert_one(doc).inserted_id)
 
     # --- UPDATED SEARCH METHODS ---
     def vector_search(self, client_id: str, query_embedding: List[float],
@@ -480,8 +921,6 @@ class MongoDBStorage:
         Optimized vector search using MongoDB Atlas Search.
         Falls back to Python if Atlas Search fails.
         """
-        import time
-        
         try:
             # Try MongoDB Atlas Vector Search first (FAST - 0.1-0.3s)
             start = time.time()
@@ -491,8 +930,8 @@ class MongoDBStorage:
                     "$vectorSearch": {
                         "index": "vector_index",
                         "path": "embedding",
-                        "queryVector": query_embedding,
-                        "numCandidates": min(limit * 20, 200),
+                        "queryVector": _normalize(query_embedding),
+                        "numCandidates": self._num_candidates(client_id, limit),
                         "limit": limit,
                         "filter": {"client_id": client_id}
                     }
@@ -513,61 +952,185 @@ class MongoDBStorage:
             ]
             
             results = list(self.documents.aggregate(pipeline))
-            elapsed = time.time() - start
-            
-            if len(results) == 0:
-                print(f"⚠️  Atlas Search returned 0 results")
-                print(f"   Checking total docs for client: {client_id}")
-                total = self.documents.count_documents({"client_id": client_id, "embedding": {"$exists": True}})
-                print(f"   Total docs available: {total}")
-                if total == 0:
-                    print(f"   ❌ No documents found for this client!")
-                else:
-                    print(f"   ⚠️  Documents exist but similarity too low. Try lowering min_score.")
-            else:
-                print(f"✅ Atlas Vector Search: {len(results)} results in {elapsed:.3f}s")
-            
+            logger.debug("Atlas Vector Search: %d results in %.3fs", len(results), time.time() - start)
             return results
             
         except Exception as e:
-            # Fallback to Python implementation (SLOW - 8-12s)
-            print(f"⚠️  Atlas Vector Search unavailable: {str(e)[:100]}")
-            print(f"   Falling back to Python search (slower)")
+            # Fallback to brute-force scoring over the client's documents (SLOW)
+            logger.warning("Atlas Vector Search unavailable, falling back to brute-force search: %.100s", e)
             
             start = time.time()
-            candidates = list(self.documents.find(
-                {"client_id": client_id, "embedding": {"$exists": True}}, 
-                {"content": 1, "embedding": 1, "metadata": 1}
-            ))
+            query = _normalize(query_embedding)
             
-            results = []
-            for doc in candidates:
-                score = self._cosine_similarity(query_embedding, doc['embedding'])
-                if score >= min_score:
-                    doc['similarity_score'] = score
-                    del doc['embedding']
-                    results.append(doc)
+            # Score on the server so embeddings never cross the wire; only the
+            # top-k {content, metadata, score} documents are returned
+            dot = {"$reduce": {
+                "input": {"$zip": {"inputs": ["$embedding", query]}},
+                "initialValue": 0.0,
+                "in": {"$add": ["$$value", {"$multiply": [
+                    {"$arrayElemAt": ["$$this", 0]}, {"$arrayElemAt": ["$$this", 1]}
+                ]}]}
+            }}
+            norm = {"$cond": [
+                {"$eq": ["$embedding_normalized", True]},
+                1.0,  # Stored unit-norm
+                {"$sqrt": {"$reduce": {
+                    "input": "$embedding",
+                    "initialValue": 0.0,
+                    "in": {"$add": ["$$value", {"$multiply": ["$$this", "$$this"]}]}
+                }}}
+            ]}
+            pipeline = [
+                {"$match": {"client_id": client_id, "embedding": {"$exists": True}}},
+                {"$addFields": {"similarity_score": {"$cond": [
+                    # Vectors of a different dimension score 0.0, as before
+                    {"$ne": [{"$size": "$embedding"}, len(query)]},
+                    0.0,
+                    {"$let": {
+                        "vars": {"dot": dot, "norm": norm},
+                        "in": {"$cond": [
+                            {"$eq": ["$$norm", 0]}, 0.0, {"$divide": ["$$dot", "$$norm"]}
+                        ]}
+                    }}
+                ]}}},
+                {"$match": {"similarity_score": {"$gte": min_score}}},
+                {"$sort": {"similarity_score": -1}},
+                {"$limit": limit},
+                {"$project": {"content": 1, "metadata": 1, "similarity_score": 1}}
+            ]
+            results = list(self.documents.aggregate(pipeline))
             
-            results.sort(key=lambda x: x['similarity_score'], reverse=True)
-            elapsed = time.time() - start
-            print(f"⚠️  Python Search: {len(results[:limit])} results in {elapsed:.3f}s")
-            return results[:limit]
+            logger.debug("Brute-force Search: %d results in %.3fs", len(results), time.time() - start)
+            return results
 
     
+    def ensure_vector_search_index(self, num_dimensions: int = 384) -> bool:
+        """
+        Create the Atlas "vector_index" used by vector_search (Atlas only).
+        
+        Atlas keeps int8 scalar-quantized copies of the vectors in the index,
+        cutting its memory footprint ~4x, while the documents keep full-precision
+        arrays for rescoring and the brute-force fallback.
+        
+        Returns:
+            True if the index was created, False if it exists or Atlas Search
+            is unavailable
+        """
+        model = SearchIndexModel(
+            name="vector_index",
+            type="vectorSearch",
+            definition={"fields": [
+                {
+                    "type": "vector",
+                    "path": "embedding",
+                    "numDimensions": num_dimensions,
+                    "similarity": "dotProduct",  # Stored vectors are unit-norm
+                    "quantization": "scalar"
+                },
+                {"type": "filter", "path": "client_id"}
+            ]}
+        )
+        try:
+            self.documents.create_search_index(model)
+            return True
+        except OperationFailure:
+            return False
+    
+    def normalize_legacy_embeddings(self, client_id: Optional[str] = None) -> int:
+        """
+        Rewrite embeddings stored before insert-time normalization as unit vectors.
+        
+        Until a document is migrated the brute-force fallback recomputes its
+        magnitude on every query; afterwards scoring is a plain dot product.
+        Runs entirely server-side as a pipeline update.
+        
+        Returns:
+            Number of documents updated
+        """
+        query: Dict[str, Any] = {
+            "embedding": {"$exists": True},
+            "embedding_normalized": {"$ne": True}
+        }
+        if client_id:
+            query["client_id"] = client_id
+        
+        norm = {"$sqrt": {"$reduce": {
+            "input": "$embedding",
+            "initialValue": 0.0,
+            "in": {"$add": ["$$value", {"$multiply": ["$$this", "$$this"]}]}
+        }}}
+        result = self.documents.update_many(query, [
+            {"$set": {"embedding": {"$let": {
+                "vars": {"norm": norm},
+                "in": {"$cond": [
+                    {"$eq": ["$$norm", 0]},
+                    "$embedding",
+                    {"$map": {"input": "$embedding", "in": {"$divide": ["$$this", "$$norm"]}}}
+                ]}
+            }}}},
+            {"$set": {"embedding_normalized": True}}
+        ])
+        return result.modified_count
+    
+    def _num_candidates(self, client_id: str, limit: int) -> int:
+        """
+        HNSW candidate pool for $vectorSearch, scaled with the client's corpus.
+        
+        A fixed cap starves recall once a client has many thousands of chunks,
+        so grow with sqrt(doc_count) between a floor and a ceiling.
+        """
+        now = time.monotonic()
+        cached = self._doc_count_cache.get(client_id)
+        if cached and now < cached[1]:
+            doc_count = cached[0]
+        else:
+            user = self.users.find_one({"_id": _oid(client_id)}, {"doc_count": 1})
+            if user and "doc_count" in user:
+                doc_count = user["doc_count"]
+            else:
+                doc_count = self.documents.count_documents({"client_id": client_id})
+            self._doc_count_cache[client_id] = (doc_count, now + 60)
+        
+        scaled = min(2000, int(4 * math.sqrt(max(doc_count, 0))))
+        return min(10000, max(limit * 20, 400, scaled))  # Atlas allows at most 10000
+    
     def close(self):
-        self.client.close()
+        # The client is shared process-wide (see _get_client), so only
+        # flush pending writes; the connection pool stays open
+        self.flush_chat_messages()
+        self.flush_last_used()
+        self.flush_activity_logs()
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+        # Leaving a `with get_storage()` block must not flush the shared
+        # write-behind buffers, or nothing would be batched across
+        # requests; they are flushed by their timers, close() and atexit
+        pass
 
     def url_exists(self, client_id: str, source_url: str) -> bool:
         """Check if a URL has already been crawled by THIS client."""
-        return self.documents.count_documents(
-            {"client_id": client_id, "metadata.source_url": source_url}
-        ) > 0
+        # Crawls check thousands of URLs back-to-back, so load the client's
+        # known URLs once and answer from memory afterwards
+        return source_url in self._known_urls(client_id)
+    
+    def urls_exist(self, client_id: str, urls: List[str]) -> set:
+        """Return the subset of `urls` already crawled by THIS client."""
+        return self._known_urls(client_id).intersection(urls)
+    
+    def _known_urls(self, client_id: str) -> set:
+        """Load (once) the set of source URLs stored for a client."""
+        if client_id not in self._url_cache:
+            # $group streams from the (client_id, source_url) index in batches,
+            # unlike distinct(), whose single reply is capped at 16MB
+            pipeline = [
+                {"$match": {"client_id": client_id}},
+                {"$group": {"_id": "$metadata.source_url"}}
+            ]
+            self._url_cache[client_id] = {item["_id"] for item in self.documents.aggregate(pipeline)}
+        return self._url_cache[client_id]
 
     def count_documents(self, client_id: str) -> int:
         """Count total documents for a specific client."""
@@ -577,10 +1140,12 @@ class MongoDBStorage:
         """Delete a single document chunk by its MongoDB _id."""
         try:
             # We must convert the string ID to a MongoDB ObjectId
-            from bson import ObjectId
             result = self.documents.delete_one(
                 {"_id": ObjectId(doc_id), "client_id": client_id}
             )
+            self._documents_changed(client_id, -result.deleted_count)
+            if result.deleted_count:
+                self._url_cache.pop(client_id, None)  # URL may still have other chunks
             return result.deleted_count > 0
         except Exception:
             return False
@@ -590,33 +1155,80 @@ class MongoDBStorage:
         result = self.documents.delete_many(
             {"client_id": client_id, "metadata.source_url": source_url}
         )
+        self._documents_changed(client_id, -result.deleted_count)
+        if client_id in self._url_cache:
+            self._url_cache[client_id].discard(source_url)
         return result.deleted_count
     
-    @staticmethod
-    def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        if len(vec1) != len(vec2): 
-            return 0.0
+    def delete_client_documents(self, client_id: str) -> int:
+        """Delete all of a client's documents."""
+        result = self.documents.delete_many({"client_id": client_id})
+        self._documents_changed(client_id, -result.deleted_count)
+        self._url_cache.pop(client_id, None)
+        return result.deleted_count
+    
+    def add_chat_message(self, session_id: str, role: str, content: str):
+        """
+        Add a message to a chat session.
         
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = sum(a * a for a in vec1) ** 0.5
-        magnitude2 = sum(b * b for b in vec2) ** 0.5
+        Messages are buffered and written in one bulk_write per flush
+        window; call flush_chat_messages() (or close()) to force the write.
+        """
+        with self._msg_lock:
+            self._msg_buffer.setdefault(session_id, []).append(
+                {"role": role, "content": content, "timestamp": datetime.utcnow()}
+            )
+            if self._msg_timer is None:
+                self._msg_timer = threading.Timer(CHAT_FLUSH_INTERVAL, self.flush_chat_messages)
+                self._msg_timer.daemon = True
+                self._msg_timer.start()
+    
+    def flush_chat_messages(self):
+        """Write all buffered chat messages in a single round-trip."""
+        with self._msg_lock:
+            buffer, self._msg_buffer = self._msg_buffer, {}
+            if self._msg_timer is not None:
+                self._msg_timer.cancel()
+                self._msg_timer = None
         
-        if magnitude1 == 0 or magnitude2 == 0: 
-            return 0.0
+        if not buffer:
+            return
         
-        return dot_product / (magnitude1 * magnitude2)
+        now = datetime.utcnow()
+        try:
+            self.chat_sessions.bulk_write(
+                [
+                    UpdateOne(
+                        {"session_id": sid},
+                        {
+                            "$push": {"messages": {"$each": messages}},
+                            "$set": {"last_active": now}
+                        },
+                        upsert=True
+                    )
+                    for sid, messages in buffer.items()
+                ],
+                ordered=False
+            )
+        except Exception as e:
+            if isinstance(e, BulkWriteError):
+                # Unordered: only the sessions listed in writeErrors failed
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+                buffer = {sid: msgs for i, (sid, msgs) in enumerate(buffer.items()) if i in failed}
+            logger.exception("Failed to write chat messages for %d sessions; will retry", len(buffer))
+            self._requeue_chat_messages(buffer)
     
-    def add_chat_message(self, session_id: str, role: str, content: str):
-        """Add a message to a chat session."""
-        self.chat_sessions.update_one(
-            {"session_id": session_id},
-            {
-                "$push": {"messages": {"role": role, "content": content, "timestamp": datetime.utcnow()}},
-                "$set": {"last_active": datetime.utcnow()}
-            },
-            upsert=True
-        )
+    def _requeue_chat_messages(self, failed: Dict[str, List[Dict]]):
+        """Put a failed batch back ahead of newer messages and schedule a retry."""
+        if not failed:
+            return
+        with self._msg_lock:
+            for sid, messages in failed.items():
+                self._msg_buffer[sid] = messages + self._msg_buffer.get(sid, [])
+            if self._msg_timer is None:
+                self._msg_timer = threading.Timer(WRITE_BEHIND_RETRY_DELAY, self.flush_chat_messages)
+                self._msg_timer.daemon = True
+                self._msg_timer.start()
 
     # ==========================================
     # 6. CRAWL JOB MANAGEMENT
@@ -661,22 +1273,19 @@ class MongoDBStorage:
 
     def get_user_crawl_jobs(self, client_id: str, limit: int = 20, skip: int = 0) -> List[Dict]:
         """Get recent crawl jobs for a specific user."""
-        jobs = list(
-            self.crawl_jobs.find({"client_id": client_id})
-            .sort("started_at", -1)  # Most recent first
-            .skip(skip)
-            .limit(limit)
-        )
-        
-        # Convert ObjectId to string
-        for job in jobs:
-            job["_id"] = str(job["_id"])
-            if job.get("started_at"):
-                job["started_at"] = job["started_at"].isoformat()
-            if job.get("completed_at"):
-                job["completed_at"] = job["completed_at"].isoformat()
-        
-        return jobs
+        # Stringify ids and dates server-side ($dateToString passes nulls through)
+        pipeline = [
+            {"$match": {"client_id": client_id}},
+            {"$sort": {"started_at": -1}},  # Most recent first
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$addFields": {
+                "_id": {"$toString": "$_id"},
+                "started_at": {"$dateToString": {"date": "$started_at", "format": ISO_DATE_FORMAT}},
+                "completed_at": {"$dateToString": {"date": "$completed_at", "format": ISO_DATE_FORMAT}}
+            }}
+        ]
+        return list(self.crawl_jobs.aggregate(pipeline))
 
     # ==========================================
     # 7. SUPER ADMIN METHODS
@@ -686,13 +1295,59 @@ class MongoDBStorage:
         """Super Admin: Get list of all clients with usage stats."""
         users = list(self.users.find({}, {"password_hash": 0})) # Hide passwords
         
-        # Attach usage stats to each user
+        # Users created before the counters were materialized need a backfill
+        legacy = [u for u in users if "doc_count" not in u or "api_key_count" not in u]
+        if legacy:
+            counts = self.reconcile_user_counts([u["_id"] for u in legacy])
+            for user in legacy:
+                user.update(counts[user["_id"]])
+        
         for user in users:
-            user_id = str(user["_id"])
-            user["doc_count"] = self.documents.count_documents({"client_id": user_id})
-            user["api_keys"] = self.api_keys.count_documents({"client_id": user_id})
+            user["api_keys"] = user.pop("api_key_count", 0)
             
         return users
+    
+    def reconcile_user_counts(self, user_ids: Optional[List[ObjectId]] = None) -> Dict[ObjectId, Dict[str, int]]:
+        """
+        Recompute the materialized doc_count/api_key_count user fields.
+        
+        The counters are maintained with unacknowledged $inc writes; the API
+        runs this daily (see run_daily_maintenance) to correct any drift.
+        
+        Args:
+            user_ids: Only reconcile these users (default: all users)
+            
+        Returns:
+            The recomputed counts, keyed by user _id
+        """
+        if user_ids is None:
+            user_ids = [user["_id"] for user in self.users.find({}, {"_id": 1}).batch_size(1000)]
+        client_ids = [str(uid) for uid in user_ids]
+        
+        # One grouped count per collection instead of one query per user
+        def counts_by_client(collection: Collection) -> Dict[str, int]:
+            pipeline = [
+                {"$match": {"client_id": {"$in": client_ids}}},
+                {"$group": {"_id": "$client_id", "count": {"$sum": 1}}}
+            ]
+            return {item["_id"]: item["count"] for item in collection.aggregate(pipeline)}
+        
+        doc_counts = counts_by_client(self.documents)
+        key_counts = counts_by_client(self.api_keys)
+        
+        counts = {
+            uid: {
+                "doc_count": doc_counts.get(str(uid), 0),
+                "api_key_count": key_counts.get(str(uid), 0)
+            }
+            for uid in user_ids
+        }
+        if counts:
+            self.users.bulk_write(
+                [UpdateOne({"_id": uid}, {"$set": values}) for uid, values in counts.items()],
+                ordered=False
+            )
+        return counts
 
     def ban_user(self, email: str) -> bool:
         """Super Admin: Ban a client."""
@@ -700,7 +1355,8 @@ class MongoDBStorage:
             {"email": email},
             {"$set": {"status": "banned"}}
         )
-        return result.modified_count > 0
+        _invalidate_key_cache()  # Owner status is baked into cached keys
+        return result.matched_count > 0
 
     def unban_user(self, email: str) -> bool:
         """Super Admin: Activate a client."""
@@ -708,58 +1364,61 @@ class MongoDBStorage:
             {"email": email},
             {"$set": {"status": "active"}}
         )
-        return result.modified_count > 0
-        
-    def validate_api_key(self, key: str) -> Optional[str]:
-        """Widget: Get client_id from API key."""
-        doc = self.api_keys.find_one({"key": key})
-        if doc:
-            # Check if the OWNER is banned
-            user = self.users.find_one({"_id": ObjectId(doc['client_id'])})
-            if user and user.get('status') == 'banned':
-                return None
-            return doc['client_id']
-        return None
+        _invalidate_key_cache()  # Owner status is baked into cached keys
+        return result.matched_count > 0
     
     def get_stats(self, client_id: Optional[str] = None) -> Dict[str, Any]:
-        """Get statistics about documents in the database."""
+        """Get statistics about documents in the database (cached briefly)."""
+        now = time.monotonic()
+        with _STATS_CACHE_LOCK:
+            cached = _STATS_CACHE.get(client_id or None)
+        if cached and now < cached[1]:
+            return cached[0]
+        
         try:
             # Build filter
             filter_query = {}
             if client_id:
                 filter_query["client_id"] = client_id
             
-            # Total documents
-            total_documents = self.documents.count_documents(filter_query)
-            
-            # Get unique sources
-            sources_pipeline = [
-                {"$match": filter_query} if filter_query else {"$match": {}},
-                {"$group": {"_id": "$metadata.source_url"}},
-                {"$count": "total"}
-            ]
-            sources_result = list(self.documents.aggregate(sources_pipeline))
-            unique_sources = sources_result[0]["total"] if sources_result else 0
-            
-            # Calculate average chunk size
-            avg_pipeline = [
-                {"$match": filter_query} if filter_query else {"$match": {}},
-                {"$group": {"_id": None, "avg_size": {"$avg": {"$strLenCP": "$content"}}}}
-            ]
-            avg_result = list(self.documents.aggregate(avg_pipeline))
-            avg_chunk_size = int(avg_result[0]["avg_size"]) if avg_result else 0
-            
-            # Get list of sources
-            sources_list_pipeline = [
-                {"$match": filter_query} if filter_query else {"$match": {}},
-                {"$group": {
-                    "_id": "$metadata.source_url",
-                    "count": {"$sum": 1},
-                    "type": {"$first": "$metadata.source_type"}
+            # One scan of the matching documents feeds every figure
+            pipeline = [
+                {"$match": filter_query},
+                # Keep only the grouped fields so content is not carried into
+                # every facet (documents from before content_length was stored
+                # are measured here)
+                {"$project": {
+                    "_id": 0,
+                    "metadata.source_url": 1,
+                    "metadata.source_type": 1,
+                    "content_length": {"$ifNull": ["$metadata.content_length", {"$strLenCP": "$content"}]}
                 }},
-                {"$limit": 100}  # Limit to avoid huge result sets
+                {"$facet": {
+                    "total": [{"$count": "n"}],
+                    "unique_sources": [
+                        {"$group": {"_id": "$metadata.source_url"}},
+                        {"$count": "n"}
+                    ],
+                    "avg_size": [
+                        {"$group": {"_id": None, "avg_size": {"$avg": "$content_length"}}}
+                    ],
+                    "sources": [
+                        {"$group": {
+                            "_id": "$metadata.source_url",
+                            "count": {"$sum": 1},
+                            "type": {"$first": "$metadata.source_type"}
+                        }},
+                        {"$limit": 100}  # Limit to avoid huge result sets
+                    ]
+                }}
             ]
-            sources_data = list(self.documents.aggregate(sources_list_pipeline))
+            # The $group stages may spill to disk for very large corpora
+            facets = next(self._documents_ro.aggregate(pipeline, allowDiskUse=True))
+            
+            total_documents = facets["total"][0]["n"] if facets["total"] else 0
+            unique_sources = facets["unique_sources"][0]["n"] if facets["unique_sources"] else 0
+            avg_chunk_size = int(facets["avg_size"][0]["avg_size"] or 0) if facets["avg_size"] else 0
+            sources_data = facets["sources"]
             sources = [
                 {
                     "url": item["_id"],
@@ -769,12 +1428,15 @@ class MongoDBStorage:
                 for item in sources_data
             ]
             
-            return {
+            stats = {
                 "total_documents": total_documents,
                 "unique_sources": unique_sources,
                 "avg_chunk_size": avg_chunk_size,
                 "sources": sources
             }
+            with _STATS_CACHE_LOCK:
+                _STATS_CACHE[client_id or None] = (stats, now + STATS_CACHE_TTL)
+            return stats
         except Exception as e:
             # Return empty stats on error
             return {
@@ -786,7 +1448,13 @@ class MongoDBStorage:
             
 # --- NOTIFICATIONS SYSTEM ---
     def create_notification(self, user_id: str, message: str, type: str = "info") -> bool:
-        """Create a notification for a specific user."""
+        """
+        Create a notification for a specific user.
+        
+        Deliberately not buffered like log_activity: notifications are
+        user-visible and low volume, so an acknowledged insert_one is kept
+        rather than a write-behind batch that could be lost unnoticed.
+        """
         self.db["notifications"].insert_one({
             "user_id": user_id,
             "message": message,
@@ -799,25 +1467,34 @@ class MongoDBStorage:
     def get_user_notifications(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Get unread or recent notifications."""
         return list(self.db["notifications"].find(
-            {"user_id": user_id}
+            {"user_id": user_id},
+            {"message": 1, "type": 1, "read": 1, "created_at": 1}  # Fields the feed renders
         ).sort("created_at", -1).limit(limit))
 
     def mark_notification_read(self, notification_id: str, user_id: str) -> bool:
         """Mark as read."""
         res = self.db["notifications"].update_one(
-            {"_id": ObjectId(notification_id), "user_id": user_id},
+            {"_id": _oid(notification_id), "user_id": user_id},
             {"$set": {"read": True}}
         )
-        return res.modified_count > 0
+        return res.matched_count > 0
+    
+    def mark_all_notifications_read(self, user_id: str) -> int:
+        """Mark every unread notification of a user as read in one update."""
+        res = self.db["notifications"].update_many(
+            {"user_id": user_id, "read": False},  # Served by the partial unread index
+            {"$set": {"read": True}}
+        )
+        return res.modified_count
     
     # --- UPDATED AUTH ---
     def update_password(self, user_id: str, new_hash: str) -> bool:
         """Update user password."""
         res = self.users.update_one(
-            {"_id": ObjectId(user_id)},
+            {"_id": _oid(user_id)},
             {"$set": {"password_hash": new_hash}}
         )
-        return res.modified_count > 0
+        return res.matched_count > 0
     
     # ==========================================
     # 9. USER DATA COLLECTION (FEATURE 2)
@@ -842,24 +1519,44 @@ class MongoDBStorage:
             return False
         
         result = self.users.update_one(
-            {"_id": ObjectId(client_id)},
+            {"_id": _oid(client_id)},
             {"$set": set_fields}
         )
-        return result.modified_count > 0 or result.matched_count > 0
+        with _SETTINGS_CACHE_LOCK:
+            _SETTINGS_CACHE.pop(client_id, None)
+        return result.matched_count > 0
     
     def get_data_collection_settings(self, client_id: str) -> Optional[Dict[str, Any]]:
-        """Get user data collection settings for a client."""
-        user = self.users.find_one({"_id": ObjectId(client_id)})
+        """Get user data collection settings for a client (cached briefly)."""
+        now = time.monotonic()
+        with _SETTINGS_CACHE_LOCK:
+            cached = _SETTINGS_CACHE.get(client_id)
+        if cached and now < cached[1]:
+            return dict(cached[0])
+        
+        user = self.users.find_one(
+            {"_id": _oid(client_id)},
+            {
+                "data_collection_enabled": 1,
+                "custom_fields": 1,
+                "data_collection_timing": 1,
+                "data_collection_message": 1,
+                "notification_emails": 1
+            }
+        )
         if not user:
             return None
         
-        return {
+        settings = {
             "enabled": user.get("data_collection_enabled", False),
             "custom_fields": user.get("custom_fields", []),
             "data_collection_timing": user.get("data_collection_timing", "after_first_message"),
             "data_collection_message": user.get("data_collection_message", "Please share your details:"),
             "notification_emails": user.get("notification_emails", [])
         }
+        with _SETTINGS_CACHE_LOCK:
+            _SETTINGS_CACHE[client_id] = (settings, now + SETTINGS_CACHE_TTL)
+        return dict(settings)
     
     def save_user_submission(
         self,
@@ -886,31 +1583,54 @@ class MongoDBStorage:
         self,
         client_id: str,
         page: int = 1,
-        page_size: int = 50
-    ) -> tuple[List[Dict[str, Any]], int]:
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
         """
-        Get user submissions for a client with pagination.
+        Get user submissions for a client, newest first.
+        
+        Pass the previous page's next_cursor as `cursor` to page by key
+        instead of skipping; `page` is then ignored.
         
         Returns:
-            Tuple of (submissions list, total count)
+            Tuple of (submissions list, total count or None if not requested,
+            cursor for the next page or None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is malformed
         """
         query = {"client_id": client_id}
         
-        total = self.user_submissions.count_documents(query)
+        # Counted separately: inside a $facet the page could not use the
+        # (client_id, submitted_at, _id) index and would sort in memory
+        total = self.user_submissions.count_documents(query) if include_total else None
         
-        submissions = list(
-            self.user_submissions
-            .find(query)
-            .sort("submitted_at", -1)
-            .skip((page - 1) * page_size)
-            .limit(page_size)
-        )
+        if cursor:
+            pipeline = [
+                {"$match": {"$and": [query, _keyset_filter("submitted_at", cursor)]}},
+                {"$sort": {"submitted_at": -1, "_id": -1}}
+            ]
+        else:
+            pipeline = [
+                {"$match": query},
+                {"$sort": {"submitted_at": -1, "_id": -1}},
+                {"$skip": (page - 1) * page_size}
+            ]
+        pipeline += [
+            {"$limit": page_size},
+            # Stringify the id server-side
+            {"$addFields": {"submission_id": {"$toString": "$_id"}}},
+            {"$project": {"_id": 0}}
+        ]
+        submissions = list(self.user_submissions.aggregate(pipeline))
         
-        # Convert ObjectId to string
-        for sub in submissions:
-            sub["submission_id"] = str(sub.pop("_id"))
+        next_cursor = None
+        if len(submissions) == page_size:
+            last = submissions[-1]
+            next_cursor = _encode_cursor(last["submitted_at"], last["submission_id"])
         
-        return submissions, total
+        return submissions, total, next_cursor
     
     def delete_user_submission(self, submission_id: str, client_id: str) -> bool:
         """
@@ -920,7 +1640,7 @@ class MongoDBStorage:
             True if deleted, False if not found or not owned by client
         """
         result = self.user_submissions.delete_one({
-            "_id": ObjectId(submission_id),
+            "_id": _oid(submission_id),
             "client_id": client_id
         })
         return result.deleted_count > 0
@@ -941,6 +1661,9 @@ class MongoDBStorage:
         """
         Log user activity for audit trail.
         
+        Entries are buffered and written unacknowledged in one insert_many per
+        flush window; call flush_activity_logs() (or close()) to force the write.
+        
         Args:
             user_id: User performing the action
             action_type: Type of action (login, logout, upload, delete, create, update, etc.)
@@ -963,7 +1686,65 @@ class MongoDBStorage:
             "user_agent": user_agent,
             "timestamp": datetime.utcnow()
         }
-        return str(self.activity_logs.insert_one(log_entry).inserted_id)
+        # Assign the id client-side so it can be returned before the write
+        log_entry["_id"] = ObjectId()
+        
+        with self._log_lock:
+            self._log_buffer.append(log_entry)
+            flush_now = len(self._log_buffer) >= ACTIVITY_LOG_BATCH_SIZE
+            if not flush_now and self._log_timer is None:
+                self._log_timer = threading.Timer(ACTIVITY_LOG_FLUSH_INTERVAL, self.flush_activity_logs)
+                self._log_timer.daemon = True
+                self._log_timer.start()
+        
+        if flush_now:
+            self.flush_activity_logs()
+        return str(log_entry["_id"])
+    
+    def flush_activity_logs(self):
+        """Write all buffered activity logs in a single round-trip."""
+        with self._log_lock:
+            buffer, self._log_buffer = self._log_buffer, []
+            if self._log_timer is not None:
+                self._log_timer.cancel()
+                self._log_timer = None
+        
+        if not buffer:
+            return
+        
+        try:
+            self._activity_logs_unacked.insert_many(buffer, ordered=False)
+        except Exception as e:
+            if isinstance(e, BulkWriteError):
+                # Unordered: only the entries listed in writeErrors failed, and
+                # a duplicate _id means an earlier attempt already wrote it
+                failed = {err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000}
+                buffer = [entry for i, entry in enumerate(buffer) if i in failed]
+            logger.exception("Failed to write %d activity logs; will retry", len(buffer))
+            self._requeue_activity_logs(buffer)
+    
+    def _requeue_activity_logs(self, failed: List[Dict]):
+        """Put a failed batch back ahead of newer entries and schedule a retry."""
+        if not failed:
+            return
+        with self._log_lock:
+            self._log_buffer = failed + self._log_buffer
+            if self._log_timer is None:
+                self._log_timer = threading.Timer(WRITE_BEHIND_RETRY_DELAY, self.flush_activity_logs)
+                self._log_timer.daemon = True
+                self._log_timer.start()
+    
+    def purge_old_activity_logs(self, days: int = ACTIVITY_LOG_RETENTION_DAYS) -> int:
+        """
+        Delete activity logs older than the retention window.
+        
+        Returns:
+            Number of logs deleted
+        """
+        from datetime import timedelta
+        
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        return self.activity_logs.delete_many({"timestamp": {"$lt": cutoff}}).deleted_count
     
     def get_activity_logs(
         self,
@@ -973,13 +1754,22 @@ class MongoDBStorage:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         limit: int = 100,
-        skip: int = 0
-    ) -> tuple[List[Dict], int]:
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[Dict], Optional[int], Optional[str]]:
         """
-        Retrieve activity logs with filtering and pagination.
+        Retrieve activity logs with filtering and pagination, newest first.
+        
+        Pass the previous page's next_cursor as `cursor` to page by key
+        instead of skipping; `skip` is then ignored.
         
         Returns:
-            Tuple of (logs list, total count)
+            Tuple of (logs list, total count or None if not requested,
+            cursor for the next page or None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is malformed
         """
         query = {}
         
@@ -996,20 +1786,33 @@ class MongoDBStorage:
             if end_date:
                 query["timestamp"]["$lte"] = end_date
         
-        total = self.activity_logs.count_documents(query)
-        logs = list(
-            self.activity_logs
-            .find(query)
-            .sort("timestamp", -1)
-            .skip(skip)
-            .limit(limit)
-        )
+        total = None
+        if include_total:
+            # An unfiltered total comes from collection metadata instead of a scan
+            total = self._activity_logs_ro.count_documents(query) if query else self._activity_logs_ro.estimated_document_count()
+        
+        if cursor:
+            pipeline = [
+                {"$match": {"$and": [query, _keyset_filter("timestamp", cursor)]}},
+                {"$sort": {"timestamp": -1, "_id": -1}}
+            ]
+        else:
+            pipeline = [
+                {"$match": query},
+                {"$sort": {"timestamp": -1, "_id": -1}},
+                {"$skip": skip}
+            ]
+        pipeline += [
+            {"$limit": limit},
+            {"$addFields": {"_id": {"$toString": "$_id"}}}  # Stringify server-side
+        ]
+        logs = list(self._activity_logs_ro.aggregate(pipeline))
         
-        # Convert ObjectId to string
-        for log in logs:
-            log["_id"] = str(log["_id"])
+        next_cursor = None
+        if len(logs) == limit:
+            next_cursor = _encode_cursor(logs[-1]["timestamp"], logs[-1]["_id"])
         
-        return logs, total
+        return logs, total, next_cursor
     
     def get_user_activity_summary(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """
@@ -1022,25 +1825,23 @@ class MongoDBStorage:
         
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get action type counts
+        # Get action type counts (covered by the user_id/timestamp index)
         pipeline = [
             {"$match": {"user_id": user_id, "timestamp": {"$gte": start_date}}},
+            {"$project": {"_id": 0, "action_type": 1}},
             {"$group": {"_id": "$action_type", "count": {"$sum": 1}}},
             {"$sort": {"count": -1}}
         ]
         
-        action_counts = {item["_id"]: item["count"] for item in self.activity_logs.aggregate(pipeline)}
+        action_counts = {item["_id"]: item["count"] for item in self._activity_logs_ro.aggregate(pipeline)}
         
         # Get recent activities
-        recent_logs = list(
-            self.activity_logs
-            .find({"user_id": user_id})
-            .sort("timestamp", -1)
-            .limit(10)
-        )
-        
-        for log in recent_logs:
-            log["_id"] = str(log["_id"])
+        recent_logs = list(self._activity_logs_ro.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$sort": {"timestamp": -1, "_id": -1}},
+            {"$limit": 10},
+            {"$addFields": {"_id": {"$toString": "$_id"}}}
+        ]))
         
         return {
             "action_counts": action_counts,
@@ -1048,5 +1849,21 @@ class MongoDBStorage:
             "total_actions": sum(action_counts.values())
         }
 
-def get_storage():
-    return MongoDBStorage()
\ No newline at end of file
+_storage_instance: Optional[MongoDBStorage] = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> MongoDBStorage:
+    """
+    Process-wide MongoDBStorage.
+    
+    Callers use it as a context manager; leaving the block keeps the
+    instance and its write buffers alive. Pending writes are flushed at
+    interpreter exit.
+    """
+    global _storage_instance
+    if _storage_instance is None:
+        with _storage_lock:
+            if _storage_instance is None:
+                _storage_instance = MongoDBStorage()
+                atexit.register(_storage_instance.close)
+    return _storage_instance
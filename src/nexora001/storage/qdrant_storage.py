@@ -7,14 +7,26 @@ from typing import List, Dict, Optional
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance, VectorParams, PointStruct, Filter, 
-    FieldCondition, MatchValue
+    FieldCondition, MatchValue, SearchParams, HnswConfigDiff,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    QuantizationSearchParams
 )
+import logging
 import os
 from dotenv import load_dotenv
 import time
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# int8 copies of the vectors kept in RAM for HNSW traversal; the float32
+# originals stay on disk for rescoring
+QUANTIZATION_CONFIG = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+)
+
 
 class QdrantStorage:
     """
@@ -29,12 +41,26 @@ class QdrantStorage:
             url: Qdrant server URL (default: from env or localhost)
         """
         self.url = url or os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.client = QdrantClient(url=self.url)
+        self.client = self._connect()
         self.collection_name = "nexora_embeddings"
         
         # Create collection if it doesn't exist
         self._ensure_collection()
     
+    def _connect(self) -> QdrantClient:
+        """Connect over gRPC (protobuf, smaller payloads), falling back to REST."""
+        try:
+            client = QdrantClient(
+                url=self.url,
+                prefer_grpc=True,
+                grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+            )
+            client.get_collections()  # gRPC connects lazily; probe it now
+            return client
+        except Exception as e:
+            logger.warning("Qdrant gRPC unavailable (%s), using REST", e)
+            return QdrantClient(url=self.url)
+    
     def _ensure_collection(self):
         """Create collection if it doesn't exist."""
         try:
@@ -42,20 +68,30 @@ class QdrantStorage:
             collection_names = [c.name for c in collections]
             
             if self.collection_name not in collection_names:
-                print(f"Creating Qdrant collection: {self.collection_name}")
+                logger.info("Creating Qdrant collection: %s", self.collection_name)
                 self.client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
                         size=384,  # all-MiniLM-L6-v2 dimension
-                        distance=Distance.COSINE
-                    )
+                        distance=Distance.COSINE,
+                        on_disk=True
+                    ),
+                    quantization_config=QUANTIZATION_CONFIG,
+                    hnsw_config=HnswConfigDiff(on_disk=True)
                 )
-                print(f"✓ Collection created: {self.collection_name}")
+                logger.info("Collection created: %s", self.collection_name)
             else:
-                print(f"✓ Collection exists: {self.collection_name}")
+                logger.debug("Collection exists: %s", self.collection_name)
+                config = self.client.get_collection(self.collection_name).config
+                if config.quantization_config is None:
+                    # Collections from before quantization are converted in place
+                    self.client.update_collection(
+                        collection_name=self.collection_name,
+                        quantization_config=QUANTIZATION_CONFIG
+                    )
                 
         except Exception as e:
-            print(f"Error ensuring collection: {e}")
+            logger.error("Error ensuring collection: %s", e)
     
     def store_embedding(
         self,
@@ -96,7 +132,7 @@ class QdrantStorage:
             return True
             
         except Exception as e:
-            print(f"Error storing embedding: {e}")
+            logger.error("Error storing embedding: %s", e)
             return False
     
     def vector_search(
@@ -127,6 +163,11 @@ class QdrantStorage:
                 query_vector=query_embedding,
                 limit=limit,
                 score_threshold=min_score,
+                search_params=SearchParams(
+                    hnsw_ef=64,
+                    exact=False,
+                    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+                ),
                 query_filter=Filter(
                     must=[
                         FieldCondition(
@@ -138,24 +179,25 @@ class QdrantStorage:
             )
             
             elapsed = time.time() - start
+            logger.debug("Qdrant Vector Search: %d results in %.3fs", len(results), elapsed)
             
-            # Format results
-            formatted = []
-            for hit in results:
-                formatted.append({
-                    "_id": hit.id,
-                    "content": hit.payload.get("content", ""),
-                    "metadata": hit.payload.get("metadata", {}),
-                    "similarity_score": hit.score
-                })
-            
-            print(f"✅ Qdrant Vector Search: {len(formatted)} results in {elapsed:.3f}s")
-            return formatted
+            return [self._hit_to_result(hit) for hit in results]
             
         except Exception as e:
-            print(f"❌ Qdrant search error: {e}")
+            logger.error("Qdrant search error: %s", e)
             return []
     
+    @staticmethod
+    def _hit_to_result(hit) -> Dict:
+        """Format a search hit in the same shape as MongoDBStorage.vector_search."""
+        payload = hit.payload or {}
+        return {
+            "_id": hit.id,
+            "content": payload.get("content", ""),
+            "metadata": payload.get("metadata", {}),
+            "similarity_score": hit.score
+        }
+    
     def delete_by_client(self, client_id: str) -> int:
         """Delete all embeddings for a client."""
         try:
@@ -172,7 +214,7 @@ class QdrantStorage:
             )
             return result
         except Exception as e:
-            print(f"Error deleting client embeddings: {e}")
+            logger.error("Error deleting client embeddings: %s", e)
             return 0
     
     def count_vectors(self, client_id: Optional[str] = None) -> int:
@@ -191,7 +233,7 @@ class QdrantStorage:
             )
             return result.count
         except Exception as e:
-            print(f"Error counting vectors: {e}")
+            logger.error("Error counting vectors: %s", e)
             return 0
 
 
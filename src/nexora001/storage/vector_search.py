@@ -9,14 +9,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Choose your vector search backend
-USE_QDRANT = os.getenv("USE_QDRANT", "false").lower() == "true"
 
-if USE_QDRANT:
-    from nexora001.storage.qdrant_storage import get_qdrant
-    print("✓ Using Qdrant for vector search (self-hosted)")
-else:
-    print("✓ Using MongoDB Atlas for vector search")
+def _use_qdrant() -> bool:
+    """
+    Choose your vector search backend.
+    
+    Read per call (an env lookup is cheap) so Mongo-only processes never
+    import the Qdrant client and the setting can change without a restart.
+    """
+    return os.getenv("USE_QDRANT", "false").lower() == "true"
 
 
 def store_document_with_vector(
@@ -41,7 +42,9 @@ def store_document_with_vector(
     Returns:
         True if successful
     """
-    if USE_QDRANT:
+    if _use_qdrant():
+        from nexora001.storage.qdrant_storage import get_qdrant
+        
         # Store embedding in Qdrant for fast search
         qdrant = get_qdrant()
         return qdrant.store_embedding(
@@ -74,7 +77,9 @@ def vector_search(
     Returns:
         List of similar documents
     """
-    if USE_QDRANT:
+    if _use_qdrant():
+        from nexora001.storage.qdrant_storage import get_qdrant
+        
         # Use Qdrant (fast, self-hosted)
         qdrant = get_qdrant()
         return qdrant.vector_search(
@@ -3,70 +3,140 @@ Test connections to MongoDB and Google Gemini API.
 Run this to verify your configuration is working.
 """
 
+import asyncio
+import io
 import sys
 import os
+import threading
+from functools import lru_cache, partial
 from pathlib import Path
 
-# Add src to path
-src_path = Path(__file__).parent. parent
-sys.path.insert(0, str(src_path))
-
 from rich.console import Console
 from rich.panel import Panel
 from dotenv import load_dotenv
 
 # Load . env from project root
 project_root = Path(__file__).parent. parent. parent
-load_dotenv(project_root / ".env")
+ENV_FILE = project_root / ".env"
 
 console = Console()
 
+_env_lock = threading.Lock()
+_ENV_MTIME = None
+
+
+def _ensure_env_loaded():
+    """Load .env, re-parsing it only when the file has changed since the last load."""
+    global _ENV_MTIME
+    
+    try:
+        mtime = ENV_FILE.stat().st_mtime_ns
+    except OSError:
+        return
+    
+    with _env_lock:
+        if mtime != _ENV_MTIME:
+            load_dotenv(ENV_FILE, override=False)
+            _ENV_MTIME = mtime
+
+
+@lru_cache(maxsize=4)
+def _get_mongo_client(uri: str):
+    """One pooled MongoClient per URI, reused by repeated checks in this process."""
+    from pymongo import MongoClient
+    
+    # Connect with short timeouts. connectTimeoutMS bounds each TCP/TLS
+    # handshake and is kept below serverSelectionTimeoutMS, the total wait
+    # for a usable server, so an unreachable host fails fast instead of
+    # hanging on the OS connect timeout.
+    return MongoClient(
+        uri,
+        serverSelectionTimeoutMS=int(os.getenv("MONGO_SSTM", "5000")),
+        connectTimeoutMS=int(os.getenv("MONGO_CTM", "2000")),
+        socketTimeoutMS=int(os.getenv("MONGO_STM", "5000"))
+    )
+
+
+# Models tried directly before falling back to listing what the key can use
+PREFERRED_CHAT_MODEL = "gemini-2.5-flash"
+PREFERRED_EMBEDDING_MODEL = "models/embedding-001"
+
+# Fallbacks for the chat model, in order of preference
+FALLBACK_CHAT_MODELS = ['gemini-2.0-flash', 'gemini-1.5-flash']
+
+
+def _find_model(method: str, preferred=()):
+    """
+    Find a model supporting ``method`` in a single pass over list_models().
+    
+    Stops paging as soon as the first ``preferred`` name is found; otherwise
+    returns the best preferred match seen, or the first capable model.
+    """
+    import google.generativeai as genai
+    
+    best, best_rank = None, len(preferred)
+    for m in genai.list_models():
+        if method not in m.supported_generation_methods:
+            continue
+        rank = next((i for i, name in enumerate(preferred) if name in m.name), len(preferred))
+        if best is None or rank < best_rank:
+            best, best_rank = m.name, rank
+        if rank == 0:
+            break
+    return best
+
 
-def test_mongodb_connection():
+def test_mongodb_connection(out: Console = console, verbose: bool = False):
     """Test MongoDB Atlas connection."""
-    console.print("\n[cyan]Testing MongoDB Connection.. .[/cyan]")
+    out.print("\n[cyan]Testing MongoDB Connection.. .[/cyan]")
+    _ensure_env_loaded()
     
     try:
-        from pymongo import MongoClient
-        
         mongodb_uri = os. getenv("MONGODB_URI", "")
         mongodb_database = os.getenv("MONGODB_DATABASE", "nexora001")
         
         if not mongodb_uri or "mongodb" not in mongodb_uri. lower():
-            console.print("[red]❌ MONGODB_URI is not set in .env[/red]")
-            console.print(f"   Current value: '{mongodb_uri[:50]}...' " if mongodb_uri else "   Current value: (empty)")
+            out.print("[red]❌ MONGODB_URI is not set in .env[/red]")
+            out.print(f"   Current value: '{mongodb_uri[:50]}...' " if mongodb_uri else "   Current value: (empty)")
             return False
         
-        # Connect with a short timeout
-        client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
+        client = _get_mongo_client(mongodb_uri)
+        
+        # Test connection with a ping; listing databases is informational only
+        client.admin.command("ping")
+        out.print(f"[green]✅ MongoDB Connected![/green]")
+        if verbose:
+            out.print(f"   Available databases: {client.list_database_names()}")
         
-        # Test connection by listing databases
-        databases = client.list_database_names()
-        console.print(f"[green]✅ MongoDB Connected![/green]")
-        console.print(f"   Available databases: {databases}")
+        from pymongo.errors import OperationFailure
         
-        # Check if our database exists
         db = client[mongodb_database]
-        collections = db.list_collection_names()
-        console.print(f"   Database '{mongodb_database}' collections: {collections}")
         
-        # Create documents collection if it doesn't exist
-        if 'documents' not in collections:
-            db.create_collection('documents')
-            console.print(f"   [yellow]Created 'documents' collection[/yellow]")
+        # Create documents collection if it doesn't exist. check_exists=False
+        # skips the driver's listCollections pre-check; the server reports an
+        # existing collection as NamespaceExists (48).
+        try:
+            db.create_collection('documents', check_exists=False)
+            out.print(f"   [yellow]Created 'documents' collection[/yellow]")
+        except OperationFailure as e:
+            if e.code != 48:
+                raise
+        
+        if verbose:
+            out.print(f"   Database '{mongodb_database}' collections: {db.list_collection_names()}")
         
-        client.close()
         return True
         
     except Exception as e:
-        console.print(f"[red]❌ MongoDB Connection Failed![/red]")
-        console.print(f"   Error: {e}")
+        out.print(f"[red]❌ MongoDB Connection Failed![/red]")
+        out.print(f"   Error: {e}")
         return False
 
 
-def test_google_gemini_connection():
+def test_google_gemini_connection(out: Console = console):
     """Test Google Gemini API connection."""
-    console.print("\n[cyan]Testing Google Gemini API...[/cyan]")
+    out.print("\n[cyan]Testing Google Gemini API...[/cyan]")
+    _ensure_env_loaded()
     
     try:
         import google.generativeai as genai
@@ -74,54 +144,57 @@ def test_google_gemini_connection():
         api_key = os. getenv("GOOGLE_API_KEY", "")
         
         if not api_key or api_key. startswith("your_") or len(api_key) < 10:
-            console. print("[red]❌ GOOGLE_API_KEY is not set in . env[/red]")
+            out.print("[red]❌ GOOGLE_API_KEY is not set in . env[/red]")
             return False
         
+        from google.api_core.exceptions import InvalidArgument, NotFound
+        
         # Configure the API
         genai.configure(api_key=api_key)
         
-        # List available models
-        models = []
-        for m in genai.list_models():
-            if 'generateContent' in m. supported_generation_methods:
-                models.append(m.name)
-        
-        console.print(f"[green]✅ Google Gemini API Connected![/green]")
-        console.print(f"   Available models: {models[:5]}...")
+        def generate(model_name):
+            # The first streamed text proves the API works, so stop there
+            # instead of waiting for the full response. Chunks without a
+            # text part (e.g. while a thinking model reasons) are skipped.
+            model = genai.GenerativeModel(model_name)
+            response = model.generate_content(
+                "Say 'Hello Nexora001!' in exactly 3 words.",
+                stream=True
+            )
+            for chunk in response:
+                if chunk.candidates and chunk.candidates[0].content.parts:
+                    return chunk.text.strip()
+            return ""
         
-        # Use a model that exists (gemini-2.0-flash or gemini-1.5-flash)
-        model_to_use = None
-        preferred_models = ['gemini-2. 0-flash', 'gemini-2. 5-flash', 'gemini-1.5-flash']
+        # Try the known model first; only list models if it is unavailable
+        model_to_use = PREFERRED_CHAT_MODEL
+        try:
+            text = generate(model_to_use)
+        except (NotFound, InvalidArgument):
+            out.print(f"   [yellow]{model_to_use} unavailable, looking for another model[/yellow]")
+            
+            # Use a model that exists (gemini-2.0-flash or gemini-1.5-flash)
+            found = _find_model('generateContent', FALLBACK_CHAT_MODELS)
+            model_to_use = found. replace('models/', '') if found else 'gemini-pro'
+            
+            text = generate(model_to_use)
         
-        for preferred in preferred_models:
-            for available in models:
-                if preferred in available:
-                    model_to_use = available. replace('models/', '')
-                    break
-            if model_to_use:
-                break
-        
-        if not model_to_use:
-            model_to_use = models[0]. replace('models/', '') if models else 'gemini-pro'
-        
-        console.print(f"   Using model: {model_to_use}")
-        
-        # Test a simple generation
-        model = genai.GenerativeModel(model_to_use)
-        response = model.generate_content("Say 'Hello Nexora001!' in exactly 3 words.")
-        console.print(f"   Test response: {response.text. strip()}")
+        out.print(f"[green]✅ Google Gemini API Connected![/green]")
+        out.print(f"   Using model: {model_to_use}")
+        out.print(f"   Test response: {text}")
         
         return True
         
     except Exception as e:
-        console.print(f"[red]❌ Google Gemini API Failed![/red]")
-        console.print(f"   Error: {e}")
+        out.print(f"[red]❌ Google Gemini API Failed![/red]")
+        out.print(f"   Error: {e}")
         return False
 
 
-def test_embedding_generation():
+def test_embedding_generation(out: Console = console):
     """Test embedding generation for RAG."""
-    console.print("\n[cyan]Testing Embedding Generation...[/cyan]")
+    out.print("\n[cyan]Testing Embedding Generation...[/cyan]")
+    _ensure_env_loaded()
     
     try:
         import google.generativeai as genai
@@ -129,51 +202,77 @@ def test_embedding_generation():
         api_key = os.getenv("GOOGLE_API_KEY", "")
         
         if not api_key or len(api_key) < 10:
-            console.print("[red]❌ GOOGLE_API_KEY is not set[/red]")
+            out.print("[red]❌ GOOGLE_API_KEY is not set[/red]")
             return False
         
-        genai.configure(api_key=api_key)
+        from google.api_core.exceptions import InvalidArgument, NotFound
         
-        # List embedding models
-        embedding_models = []
-        for m in genai.list_models():
-            if 'embedContent' in m.supported_generation_methods:
-                embedding_models.append(m. name)
-        
-        console.print(f"   Available embedding models: {embedding_models[:3]}")
+        genai.configure(api_key=api_key)
         
-        # Use the first available embedding model
-        embed_model = embedding_models[0] if embedding_models else "models/embedding-001"
+        def embed(model_name):
+            return genai.embed_content(
+                model=model_name,
+                content="This is a test sentence for Nexora001.",
+                task_type="retrieval_document"
+            )
         
-        # Test embedding
-        result = genai.embed_content(
-            model=embed_model,
-            content="This is a test sentence for Nexora001.",
-            task_type="retrieval_document"
-        )
+        # Try the known model first; only list models if it is unavailable
+        embed_model = PREFERRED_EMBEDDING_MODEL
+        try:
+            result = embed(embed_model)
+        except (NotFound, InvalidArgument):
+            # Use the first available embedding model
+            found = _find_model('embedContent')
+            if not found:
+                raise
+            embed_model = found
+            result = embed(embed_model)
         
         embedding = result['embedding']
-        console.print(f"[green]✅ Embedding Generation Works![/green]")
-        console.print(f"   Model used: {embed_model}")
-        console. print(f"   Embedding dimensions: {len(embedding)}")
-        console.print(f"   First 5 values: {[round(v, 4) for v in embedding[:5]]}")
+        out.print(f"[green]✅ Embedding Generation Works![/green]")
+        out.print(f"   Model used: {embed_model}")
+        out.print(f"   Embedding dimensions: {len(embedding)}")
+        out.print(f"   First 5 values: {[round(v, 4) for v in embedding[:5]]}")
         
         return True
         
     except Exception as e:
         error_str = str(e)
         if "429" in error_str and "quota" in error_str.lower():
-            console.print(f"[yellow]⚠️  Embedding API quota exceeded (Free tier limit)[/yellow]")
-            console.print(f"   [dim]Note: Google free tier doesn't support embeddings[/dim]")
-            console.print(f"   [dim]Consider: sentence-transformers or OpenAI embeddings[/dim]")
+            out.print(f"[yellow]⚠️  Embedding API quota exceeded (Free tier limit)[/yellow]")
+            out.print(f"   [dim]Note: Google free tier doesn't support embeddings[/dim]")
+            out.print(f"   [dim]Consider: sentence-transformers or OpenAI embeddings[/dim]")
         else:
-            console.print(f"[red]❌ Embedding Generation Failed![/red]")
-            console.print(f"   Error: {e}")
+            out.print(f"[red]❌ Embedding Generation Failed![/red]")
+            out.print(f"   Error: {e}")
         return False
 
 
+async def _run_checks(checks):
+    """
+    Run the blocking checks concurrently, each in its own thread.
+    
+    Each check prints into its own buffer, replayed in order afterwards so
+    the output of concurrent checks does not interleave.
+    """
+    buffers = {name: io.StringIO() for name in checks}
+    outputs = {
+        name: Console(file=buffers[name], force_terminal=console.is_terminal, width=console.width)
+        for name in checks
+    }
+    passed = await asyncio.gather(
+        *(asyncio.to_thread(check, outputs[name]) for name, check in checks.items()),
+        return_exceptions=True
+    )
+    for name in checks:
+        console.file.write(buffers[name].getvalue())
+    return {name: result is True for name, result in zip(checks, passed)}
+
+
 def main():
-    """Run all connection tests."""
+    """Run all connection tests. Pass --verbose to also list databases."""
+    verbose = "--verbose" in sys.argv[1:]
+    
     console.print(Panel(
         "[bold blue]Nexora001 Connection Tests[/bold blue]\n"
         "Testing MongoDB and Google Gemini API connections...",
@@ -182,14 +281,15 @@ def main():
     
     # Show what we're loading
     console.print("\n[dim]Loading from .env file...[/dim]")
+    _ensure_env_loaded()
     console.print(f"[dim]MONGODB_URI: {'Set ✓' if os. getenv('MONGODB_URI') else 'Not set ✗'}[/dim]")
     console.print(f"[dim]GOOGLE_API_KEY: {'Set ✓' if os.getenv('GOOGLE_API_KEY') else 'Not set ✗'}[/dim]")
     
-    results = {
-        "MongoDB": test_mongodb_connection(),
-        "Google Gemini": test_google_gemini_connection(),
-        "Embeddings": test_embedding_generation(),
-    }
+    results = asyncio.run(_run_checks({
+        "MongoDB": partial(test_mongodb_connection, verbose=verbose),
+        "Google Gemini": test_google_gemini_connection,
+        "Embeddings": test_embedding_generation,
+    }))
     
     # Summary
     console.print("\n" + "=" * 50)
@@ -198,10 +298,12 @@ def main():
     critical_passed = results["MongoDB"] and results["Google Gemini"]
     all_passed = all(results.values())
     
+    lines = []
     for service, passed in results. items():
         status = "[green]✅ PASS[/green]" if passed else "[red]❌ FAIL[/red]"
         optional = " (optional)" if service == "Embeddings" else ""
-        console.print(f"  {service}{optional}: {status}")
+        lines.append(f"  {service}{optional}: {status}")
+    console.print("\n".join(lines))
     
     console.print("=" * 50)
     
@@ -0,0 +1,12 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from nexora001.config import Settings
+
+
+@pytest.fixture(scope="session")
+def default_settings():
+    """Settings loaded from the environment, built once per test session."""
+    return Settings()
@@ -6,15 +6,14 @@ import pytest
 from nexora001.config import Settings
 
 
-def test_settings_loads():
+def test_settings_loads(default_settings):
     """Test that settings can be instantiated."""
-    settings = Settings()
-    assert settings is not None
+    assert default_settings is not None
 
 
-def test_default_values():
+def test_default_values(default_settings):
     """Test default configuration values."""
-    settings = Settings()
+    settings = default_settings
     assert settings.mongodb_database == "nexora001"
     assert settings.debug == True
     assert settings. crawl_delay == 1.0
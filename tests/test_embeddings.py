@@ -0,0 +1,54 @@
+"""
+Tests for the embedding generator's caches.
+
+The model is a mock, so no sentence-transformers download is needed.
+"""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from nexora001.processors.embeddings import EmbeddingGenerator, EmbeddingProvider
+
+
+def make_generator(disk_cache_dir=None):
+    """EmbeddingGenerator with a mocked sentence-transformers model."""
+    gen = EmbeddingGenerator.__new__(EmbeddingGenerator)
+    gen.provider = EmbeddingProvider.SENTENCE_TRANSFORMERS
+    gen.model = MagicMock()
+    gen.model.encode.side_effect = lambda texts, **kwargs: np.array(
+        [[float(len(t)), 0.5] for t in texts] if isinstance(texts, list) else [float(len(texts)), 0.5]
+    )
+    gen.cache = {}
+    gen.cache_hits = 0
+    gen.cache_misses = 0
+    gen.disk_cache_dir = disk_cache_dir
+    return gen
+
+
+def test_batch_encodes_each_missing_text_once():
+    """Test duplicates and cached texts are not sent to the model."""
+    gen = make_generator()
+    gen.generate_embedding("cached")
+
+    result = gen.generate_embeddings(["a", "cached", "bb", "a"])
+
+    assert result == [[1.0, 0.5], [6.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert gen.model.encode.call_args.args[0] == ["a", "bb"]
+    assert (gen.cache_hits, gen.cache_misses) == (2, 3)
+
+
+@pytest.mark.parametrize("embed", [
+    lambda gen: gen.generate_embedding("hello"),
+    lambda gen: gen.generate_embeddings(["hello"])[0],
+])
+def test_disk_cache_survives_new_generator(tmp_path, embed):
+    """Test a restarted generator reads embeddings back from disk."""
+    first = make_generator(tmp_path)
+    expected = embed(first)
+
+    second = make_generator(tmp_path)
+    assert embed(second) == expected
+    second.model.encode.assert_not_called()
+    assert not list(tmp_path.glob("*.tmp"))
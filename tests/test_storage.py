@@ -0,0 +1,303 @@
+"""
+Tests for MongoDB storage helpers.
+
+The storage object is built without __init__ and its collections are
+replaced with mocks, so no MongoDB server is needed.
+"""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, AutoReconnect, OperationFailure, ServerSelectionTimeoutError
+
+from nexora001.storage import mongodb
+from nexora001.storage.mongodb import MongoDBStorage, _encode_cursor, _keyset_filter
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """MongoDBStorage with mocked collections and empty write buffers."""
+    # Keep flush timers from firing mid-test; tests flush explicitly
+    for name in ("CHAT_FLUSH_INTERVAL", "LAST_USED_FLUSH_INTERVAL",
+                 "ACTIVITY_LOG_FLUSH_INTERVAL", "WRITE_BEHIND_RETRY_DELAY"):
+        monkeypatch.setattr(mongodb, name, 60)
+
+    s = MongoDBStorage.__new__(MongoDBStorage)
+    s.documents = MagicMock()
+    s.api_keys = MagicMock()
+    s.chat_sessions = MagicMock()
+    s.user_submissions = MagicMock()
+    s._activity_logs_unacked = MagicMock()
+    s._last_used, s._last_used_lock, s._last_used_timer = {}, threading.Lock(), None
+    s._msg_buffer, s._msg_lock, s._msg_timer = {}, threading.Lock(), None
+    s._log_buffer, s._log_lock, s._log_timer = [], threading.Lock(), None
+    mongodb._invalidate_key_cache()
+
+    yield s
+
+    for timer in (s._last_used_timer, s._msg_timer, s._log_timer):
+        if timer is not None:
+            timer.cancel()
+    mongodb._invalidate_key_cache()
+
+
+# ==========================================
+# Index creation
+# ==========================================
+
+@pytest.fixture
+def unindexed(storage, monkeypatch):
+    """Storage whose database has not had its indexes ensured yet."""
+    monkeypatch.setattr(mongodb, "_INDEXED_DATABASES", set())
+    storage.uri, storage.database_name = "mongodb://test", "test"
+    storage.users, storage.crawl_jobs, storage.activity_logs, storage.db = (MagicMock() for _ in range(4))
+    return storage
+
+
+def test_index_errors_are_logged_not_raised(unindexed):
+    """Test a user without createIndex privilege can still construct storage."""
+    collections = (unindexed.documents, unindexed.users, unindexed.api_keys, unindexed.crawl_jobs,
+                   unindexed.chat_sessions, unindexed.user_submissions, unindexed.activity_logs,
+                   unindexed.db["notifications"])
+    for collection in collections:
+        collection.create_indexes.side_effect = OperationFailure("not authorized", code=13)
+    unindexed.chat_sessions.create_index.side_effect = OperationFailure("not authorized", code=13)
+
+    unindexed._create_indexes()
+
+    assert ("mongodb://test", "test") in mongodb._INDEXED_DATABASES
+    unindexed.documents.create_indexes.assert_called_once()  # No per-index retries
+
+
+def test_unreachable_server_retries_index_creation_later(unindexed):
+    """Test a server selection timeout neither raises nor marks the database."""
+    unindexed.documents.create_indexes.side_effect = ServerSelectionTimeoutError("no servers")
+
+    unindexed._create_indexes()
+
+    assert ("mongodb://test", "test") not in mongodb._INDEXED_DATABASES
+    unindexed.users.create_indexes.assert_not_called()
+
+
+# ==========================================
+# Keyset pagination cursors
+# ==========================================
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to a filter strictly after its item."""
+    ts = datetime(2025, 1, 2, 3, 4, 5, 678000)
+    oid = ObjectId()
+
+    assert _keyset_filter("submitted_at", _encode_cursor(ts, oid)) == {"$or": [
+        {"submitted_at": {"$lt": ts}},
+        {"submitted_at": ts, "_id": {"$lt": oid}}
+    ]}
+
+
+def test_cursor_accepts_stringified_id():
+    """Test cursors built from the $toString ids that pages return."""
+    ts = datetime(2025, 1, 2)
+    oid = ObjectId()
+
+    assert _keyset_filter("timestamp", _encode_cursor(ts, str(oid))) == _keyset_filter("timestamp", _encode_cursor(ts, oid))
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "2025-01-02T00:00:00_not-an-id", "_" + str(ObjectId())])
+def test_malformed_cursor_raises_value_error(cursor):
+    """Test malformed cursors raise ValueError (routes answer 400)."""
+    with pytest.raises(ValueError):
+        _keyset_filter("timestamp", cursor)
+
+
+def test_submissions_page_outside_facet(storage):
+    """Test a cursor page is a plain indexed pipeline with a separate count."""
+    storage.user_submissions.count_documents.return_value = 7
+    storage.user_submissions.aggregate.return_value = iter([])
+    cursor = _encode_cursor(datetime(2025, 1, 2), ObjectId())
+
+    items, total, next_cursor = storage.get_user_submissions("client-1", page_size=2, cursor=cursor)
+
+    pipeline = storage.user_submissions.aggregate.call_args.args[0]
+    assert (items, total, next_cursor) == ([], 7, None)
+    assert pipeline[0] == {"$match": {"$and": [{"client_id": "client-1"}, _keyset_filter("submitted_at", cursor)]}}
+    assert not any("$facet" in stage for stage in pipeline)
+
+
+# ==========================================
+# Write-behind buffers
+# ==========================================
+
+def test_chat_messages_flush_in_one_bulk_write(storage):
+    """Test buffered messages are written as one upsert per session."""
+    storage.add_chat_message("s1", "user", "hi")
+    storage.add_chat_message("s1", "assistant", "hello")
+    storage.add_chat_message("s2", "user", "hey")
+    storage.flush_chat_messages()
+
+    ops = storage.chat_sessions.bulk_write.call_args.args[0]
+    assert storage.chat_sessions.bulk_write.call_count == 1
+    assert [op._filter for op in ops] == [{"session_id": "s1"}, {"session_id": "s2"}]
+    assert [m["content"] for m in ops[0]._doc["$push"]["messages"]["$each"]] == ["hi", "hello"]
+    assert storage._msg_buffer == {}
+
+
+def test_leaving_context_keeps_messages_buffered(storage):
+    """Test `with get_storage()` blocks don't force a flush on exit."""
+    with storage:
+        storage.add_chat_message("s1", "user", "hi")
+
+    storage.chat_sessions.bulk_write.assert_not_called()
+    assert [m["content"] for m in storage._msg_buffer["s1"]] == ["hi"]
+
+
+def test_failed_chat_flush_requeues_ahead_of_new_messages(storage):
+    """Test a failed flush keeps the batch, in order, and schedules a retry."""
+    storage.chat_sessions.bulk_write.side_effect = AutoReconnect("down")
+    storage.add_chat_message("s1", "user", "first")
+    storage.flush_chat_messages()
+    storage.add_chat_message("s1", "user", "second")
+
+    assert [m["content"] for m in storage._msg_buffer["s1"]] == ["first", "second"]
+    assert storage._msg_timer is not None
+
+
+def test_partial_chat_flush_requeues_only_failed_sessions(storage):
+    """Test sessions already written by an unordered bulk_write are not retried."""
+    storage.chat_sessions.bulk_write.side_effect = BulkWriteError({
+        "writeErrors": [{"index": 1, "code": 2, "errmsg": "failed"}],
+        "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+        "nMatched": 1, "nModified": 1, "nRemoved": 0, "upserted": []
+    })
+    storage.add_chat_message("s1", "user", "written")
+    storage.add_chat_message("s2", "user", "failed")
+    storage.flush_chat_messages()
+
+    assert list(storage._msg_buffer) == ["s2"]
+
+
+def test_last_used_flush_requeues_without_overwriting_newer(storage):
+    """Test a failed last_used flush keeps timestamps newer than the batch."""
+    key_id, other_id = ObjectId(), ObjectId()
+    newer = datetime(2100, 1, 1)
+    storage._touch_api_key(key_id)
+    storage._touch_api_key(other_id)
+
+    def touch_during_write(*args, **kwargs):
+        storage._last_used[key_id] = newer
+        raise AutoReconnect("down")
+
+    storage.api_keys.bulk_write.side_effect = touch_during_write
+    storage.flush_last_used()
+
+    assert storage._last_used[key_id] == newer
+    assert other_id in storage._last_used
+    assert storage._last_used_timer is not None
+
+
+def test_activity_logs_flush_at_batch_size(storage, monkeypatch):
+    """Test a full backlog is written immediately with client-side ids."""
+    monkeypatch.setattr(mongodb, "ACTIVITY_LOG_BATCH_SIZE", 2)
+    first = storage.log_activity("u1", "login")
+    storage._activity_logs_unacked.insert_many.assert_not_called()
+    second = storage.log_activity("u1", "logout")
+
+    entries = storage._activity_logs_unacked.insert_many.call_args.args[0]
+    assert [str(e["_id"]) for e in entries] == [first, second]
+    assert storage._log_buffer == []
+
+
+def test_failed_activity_log_flush_requeues_ahead_of_new_entries(storage):
+    """Test a failed flush keeps the batch, in order, and schedules a retry."""
+    storage._activity_logs_unacked.insert_many.side_effect = AutoReconnect("down")
+    storage.log_activity("u1", "login")
+    storage.flush_activity_logs()
+    storage.log_activity("u1", "logout")
+
+    assert [e["action_type"] for e in storage._log_buffer] == ["login", "logout"]
+    assert storage._log_timer is not None
+
+
+def test_partial_activity_log_flush_requeues_only_unwritten_entries(storage):
+    """Test written entries and duplicates of earlier attempts are not retried."""
+    storage._activity_logs_unacked.insert_many.side_effect = BulkWriteError({
+        "writeErrors": [
+            {"index": 1, "code": 11000, "errmsg": "duplicate key"},
+            {"index": 2, "code": 2, "errmsg": "failed"}
+        ],
+        "writeConcernErrors": [], "nInserted": 1, "nUpserted": 0,
+        "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []
+    })
+    for action in ("login", "upload", "logout"):
+        storage.log_activity("u1", action)
+    storage.flush_activity_logs()
+
+    assert [e["action_type"] for e in storage._log_buffer] == ["logout"]
+
+
+# ==========================================
+# Materialized user counters
+# ==========================================
+
+def test_user_counter_skips_users_without_the_field(storage):
+    """Test $inc never creates a counter on users still awaiting backfill."""
+    storage._users_unacked = MagicMock()
+    client_id = str(ObjectId())
+    storage._inc_user_counter(client_id, "doc_count", 10)
+
+    query, update = storage._users_unacked.update_one.call_args.args
+    assert query == {"_id": ObjectId(client_id), "doc_count": {"$exists": True}}
+    assert update == {"$inc": {"doc_count": 10}}
+
+
+# ==========================================
+# API key validation
+# ==========================================
+
+def test_validate_api_key_requires_active_status(storage):
+    """Test only active keys, or legacy keys without a status, are matched."""
+    storage.api_keys.aggregate.return_value = iter([])
+
+    assert storage.validate_api_key("nx_key") is None
+    pipeline = storage.api_keys.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"key": "nx_key", "status": {"$in": ["active", None]}}}
+    assert {"$match": {"owner.status": {"$ne": "banned"}}} in pipeline
+
+
+def test_validate_api_key_caches_valid_keys(storage):
+    """Test a valid key is served from the cache and its use is buffered."""
+    key_id = ObjectId()
+    storage.api_keys.aggregate.return_value = iter([{"_id": key_id, "client_id": "client-1"}])
+
+    assert storage.validate_api_key("nx_key") == "client-1"
+    assert storage.validate_api_key("nx_key") == "client-1"
+    assert storage.api_keys.aggregate.call_count == 1
+    assert key_id in storage._last_used
+
+    mongodb._invalidate_key_cache("client-1")
+    storage.api_keys.aggregate.return_value = iter([])
+    assert storage.validate_api_key("nx_key") is None
+
+
+# ==========================================
+# Embedding migration
+# ==========================================
+
+def test_normalize_legacy_embeddings_returns_modified_count(storage):
+    """Test the migration reports how many documents it rewrote."""
+    storage.documents.update_many.return_value = MagicMock(modified_count=3)
+    assert storage.normalize_legacy_embeddings() == 3
+
+
+def test_normalize_legacy_embeddings_skips_migrated_documents(storage):
+    """Test only unmigrated embeddings of the given client are selected."""
+    storage.documents.update_many.return_value = MagicMock(modified_count=0)
+    storage.normalize_legacy_embeddings(client_id="client-1")
+
+    query, pipeline = storage.documents.update_many.call_args.args
+    assert query["client_id"] == "client-1"
+    assert query["embedding"] == {"$exists": True}
+    assert query["embedding_normalized"] == {"$ne": True}
+    assert pipeline[-1] == {"$set": {"embedding_normalized": True}}